@@ -0,0 +1,203 @@
+# DAY 4: Reading Compressed CSV Files On The Fly
+# Order drops arrive as .csv.gz, .csv.bz2 or .csv.xz. Instead of unpacking
+# them to disk first, open_text() looks at the first bytes of the file and
+# decompresses while we read - csv.reader / DictReader never notice.
+#
+# A .gz file can hold several "members" (e.g. `cat monday.gz tuesday.gz`).
+# Members are independent, so they are inflated in parallel worker processes
+# and handed back in file order.
+
+import bz2
+import gzip
+import io
+import lzma
+import mmap
+import os
+import zlib
+
+from process_pool import process_pool
+
+# First bytes of each format -> name
+MAGIC_BYTES = {
+    b'\x1f\x8b': 'gzip',
+    b'BZh': 'bz2',
+    b'\xfd7zXZ\x00': 'xz',
+}
+
+GZIP_MEMBER_MAGIC = b'\x1f\x8b\x08'
+READ_SIZE = 1024 * 1024
+# Bigger members are inflated as a stream instead of in one worker call
+MAX_MEMBER_BYTES = 64 * 1024 * 1024
+
+
+# ==========================================
+# 1. DETECTING COMPRESSION
+# ==========================================
+
+def detect_compression(path):
+    """'gzip', 'bz2', 'xz' or None for a plain file - by content, not by extension"""
+    with open(path, 'rb') as file:
+        head = file.read(6)
+    for magic, kind in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return kind
+    return None
+
+
+def gzip_member_candidates(path):
+    """
+    Byte offsets that look like the start of a gzip member
+    Compressed data can contain the same bytes by chance - those false
+    candidates simply fail to inflate and are never used
+    """
+    with open(path, 'rb') as file:
+        if file.seek(0, 2) == 0:
+            return []
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            offsets = []
+            position = mm.find(GZIP_MEMBER_MAGIC)
+            while position != -1:
+                offsets.append(position)
+                position = mm.find(GZIP_MEMBER_MAGIC, position + 1)
+            return offsets
+
+
+# ==========================================
+# 2. INFLATING GZIP MEMBERS
+# ==========================================
+
+def inflate_member(task):
+    """
+    Worker: inflate the member starting at `start`
+    Returns (end offset, data), 'too big' if it grows past MAX_MEMBER_BYTES,
+    or None when `start` is not a real member
+    """
+    path, start = task
+    decompressor = zlib.decompressobj(wbits=31)   # 31 = gzip header + CRC check
+    chunks = []
+    inflated = 0
+    position = start
+    try:
+        with open(path, 'rb') as file:
+            file.seek(start)
+            while not decompressor.eof:
+                data = file.read(READ_SIZE)
+                if not data:
+                    return None
+                chunk = decompressor.decompress(data)
+                chunks.append(chunk)
+                inflated += len(chunk)
+                position += len(data)
+                if inflated > MAX_MEMBER_BYTES and not decompressor.eof:
+                    return 'too big'
+    except zlib.error:
+        return None
+    return position - len(decompressor.unused_data), b''.join(chunks)
+
+
+def stream_member(path, start, end_holder):
+    """Inflate one (large) member chunk by chunk; its end offset goes into end_holder"""
+    decompressor = zlib.decompressobj(wbits=31)
+    position = start
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while not decompressor.eof:
+            data = file.read(READ_SIZE)
+            if not data:
+                raise EOFError(f"{path}: gzip member at byte {start} is truncated")
+            position += len(data)
+            yield decompressor.decompress(data)
+    end_holder.append(position - len(decompressor.unused_data))
+
+
+def iter_gzip_members(path, workers):
+    """Yield the inflated bytes of every member in file order, `workers` at a time"""
+    candidates = gzip_member_candidates(path)
+    size = os.path.getsize(path)
+
+    with process_pool(workers) as pool:
+        pending = {}          # candidate offset -> future
+        next_candidate = 0
+        expected = 0          # where the next real member starts
+        while expected < size:
+            # Keep a few members in flight ahead of the reader
+            while next_candidate < len(candidates) and len(pending) < workers * 2:
+                start = candidates[next_candidate]
+                next_candidate += 1
+                if start >= expected:
+                    pending[start] = pool.submit(inflate_member, (path, start))
+
+            future = pending.pop(expected, None)
+            result = future.result() if future else inflate_member((path, expected))
+
+            if result == 'too big':
+                end_holder = []
+                yield from stream_member(path, expected, end_holder)
+                end = end_holder[0]
+            elif result is None:
+                with open(path, 'rb') as file:
+                    file.seek(expected)
+                    if not file.read().strip(b'\x00'):
+                        return   # zero padding after the last member
+                raise OSError(f"{path}: no valid gzip member at byte {expected}")
+            else:
+                end, data = result
+                yield data
+
+            # Candidates inside the member we just read were false alarms
+            for start in [start for start in pending if start < end]:
+                pending.pop(start).cancel()
+            expected = end
+
+
+class ChunkReader(io.RawIOBase):
+    """Minimal read-only file object over an iterator of bytes chunks"""
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._view = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        while not self._view:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._view = memoryview(chunk)
+        n = min(len(buffer), len(self._view))
+        buffer[:n] = self._view[:n]
+        self._view = self._view[n:]
+        return n
+
+    def close(self):
+        # Stops the generator, which shuts its process pool down
+        if hasattr(self._chunks, 'close'):
+            self._chunks.close()
+        super().close()
+
+
+# ==========================================
+# 3. ONE OPEN() FOR EVERY FORMAT
+# ==========================================
+
+def open_text(path, workers=None):
+    """
+    Open a CSV for reading as text, compressed or not
+    (use it exactly like open(path, 'r', newline=''))
+    workers: processes for multi-member .gz files (default: one per CPU core)
+    """
+    kind = detect_compression(path)
+    if kind is None:
+        return open(path, 'r', newline='')
+    if kind == 'bz2':
+        return bz2.open(path, 'rt', newline='')
+    if kind == 'xz':
+        return lzma.open(path, 'rt', newline='')
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(gzip_member_candidates(path)) > 1:
+        raw = ChunkReader(iter_gzip_members(path, workers))
+        return io.TextIOWrapper(io.BufferedReader(raw, READ_SIZE), newline='')
+    return gzip.open(path, 'rt', newline='')
@@ -0,0 +1,109 @@
+# DAY 4: Parse-Once CSV Cache
+# Reading the same CSV four times means opening, decoding and splitting it
+# four times. This cache parses a file ONCE and hands the parsed rows to
+# every reader after that - until the file changes on disk.
+#   - key: path + size + modification time (+ inode), so edits are noticed
+#   - memory budget: when many files are cached, the least recently used
+#     ones are dropped first (like Laravel's Cache with an LRU store)
+
+import csv
+import os
+import sys
+from collections import OrderedDict
+
+from compressed_files import open_text
+
+CACHE_BUDGET_BYTES = 64 * 1024 * 1024
+
+# path -> {'signature': ..., 'rows': [header, row, ...], 'nbytes': ...}
+_cache = OrderedDict()
+_stats = {'parses': 0, 'hits': 0, 'evictions': 0}
+_budget = {'bytes': CACHE_BUDGET_BYTES}
+
+
+# ==========================================
+# 1. CACHE HELPERS
+# ==========================================
+
+def file_signature(path):
+    """What must stay the same for a cached parse to still be valid"""
+    info = os.stat(path)
+    return (info.st_size, info.st_mtime_ns, info.st_ino)
+
+
+def rows_nbytes(rows):
+    """Rough memory used by parsed rows (tuples + their strings)"""
+    return sum(sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in rows)
+
+
+def set_cache_budget(nbytes):
+    """Change the memory budget (drops old entries if needed)"""
+    _budget['bytes'] = nbytes
+    _evict()
+
+
+def _evict():
+    """Drop least recently used files until we fit in the budget"""
+    total = sum(entry['nbytes'] for entry in _cache.values())
+    while _cache and total > _budget['bytes']:
+        _, entry = _cache.popitem(last=False)
+        total -= entry['nbytes']
+        _stats['evictions'] += 1
+
+
+def parsed_rows(path):
+    """
+    All rows of a CSV (header first) as tuples - parsed at most once per version
+    Rows are shared between callers, that's why they are tuples (read-only)
+    """
+    path = os.path.abspath(path)
+    signature = file_signature(path)
+
+    entry = _cache.get(path)
+    if entry is not None and entry['signature'] == signature:
+        _cache.move_to_end(path)
+        _stats['hits'] += 1
+        return entry['rows']
+
+    # .gz / .bz2 / .xz files are decompressed on the fly
+    with open_text(path) as file:
+        rows = [tuple(row) for row in csv.reader(file)]
+    _stats['parses'] += 1
+
+    nbytes = rows_nbytes(rows)
+    _cache.pop(path, None)
+    if nbytes <= _budget['bytes']:
+        _cache[path] = {'signature': signature, 'rows': rows, 'nbytes': nbytes}
+        _evict()
+    return rows
+
+
+# ==========================================
+# 2. DROP-IN READERS
+# ==========================================
+
+def read_rows(path):
+    """Like csv.reader(): every row (header included) as a list of strings"""
+    for row in parsed_rows(path):
+        yield list(row)
+
+
+def read_dicts(path):
+    """Like csv.DictReader(): every data row as a {column: value} dict"""
+    rows = parsed_rows(path)
+    if not rows:
+        return
+    header = rows[0]
+    for row in rows[1:]:
+        if row:
+            yield dict(zip(header, row))
+
+
+def cache_stats():
+    """How often we parsed vs reused, plus what is cached right now"""
+    return dict(_stats, files=len(_cache), nbytes=sum(entry['nbytes'] for entry in _cache.values()))
+
+
+def clear_cache():
+    """Forget every cached file"""
+    _cache.clear()
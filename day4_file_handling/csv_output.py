@@ -0,0 +1,195 @@
+# DAY 4: Safe, Fast CSV Output Files
+# csv.DictWriter straight to the final file name has three problems on big
+# exports:
+#   - a crash halfway leaves a half-written file where the old one was
+#   - every row goes through the dict -> csv machinery one by one
+#   - while the disk is busy writing, Python just waits
+# This layer writes to <name>.tmp and renames it only when everything
+# succeeded, turns rows into ready-made text lines (plain ','.join() when no
+# quoting is needed), writes them in large batches, and can hand the
+# batches to a background thread that writes while we compute the next rows.
+# Everything else that replaces a file (reports, checkpoints, the catalog)
+# uses write_file() from here too, so the rename logic lives in one place.
+# (Like Laravel's Storage::put() writing atomically + a queued job doing the I/O)
+
+import csv
+import io
+import os
+import queue
+import threading
+
+BUFFER_SIZE = 1024 * 1024
+# Lines collected before they are encoded and written in one go
+BATCH_LINES = 2000
+# Batches waiting for the background thread - the producer waits when full
+MAX_QUEUED_BATCHES = 64
+
+_quote_buffer = io.StringIO()
+_quote_writer = csv.writer(_quote_buffer)
+
+
+# ==========================================
+# 1. ROWS -> LINES
+# ==========================================
+
+def join_row(values):
+    """
+    One CSV line (with '\\r\\n', like csv.writer) from a list of values
+    Plain ','.join() when nothing needs quotes - csv.writer only for the rest
+    """
+    try:
+        line = ','.join(values)          # all strings (rows read from a CSV)
+    except TypeError:
+        # csv.writer writes None as an empty field - leave those to it
+        line = None if None in values else ','.join(map(str, values))
+    if (line is not None and len(values) > 1 and line.count(',') == len(values) - 1
+            and '"' not in line and '\n' not in line and '\r' not in line):
+        return line + '\r\n'
+    _quote_buffer.seek(0)
+    _quote_buffer.truncate()
+    _quote_writer.writerow(values)
+    return _quote_buffer.getvalue()
+
+
+# ==========================================
+# 2. BACKGROUND WRITER THREAD
+# ==========================================
+
+def start_writer_thread(max_queued=MAX_QUEUED_BATCHES):
+    """One thread that does the actual file writes for any number of outputs"""
+    writer_thread = {'queue': queue.Queue(max_queued), 'error': None}
+
+    def run():
+        while True:
+            task = writer_thread['queue'].get()
+            try:
+                if task is None:
+                    return
+                if writer_thread['error'] is None:
+                    file, data = task
+                    file.write(data)
+            except Exception as error:   # reported to the producer, see check_writer_thread()
+                writer_thread['error'] = error
+            finally:
+                writer_thread['queue'].task_done()
+
+    writer_thread['thread'] = threading.Thread(target=run, name='csv-output-writer', daemon=True)
+    writer_thread['thread'].start()
+    return writer_thread
+
+
+def check_writer_thread(writer_thread):
+    """Raise the background thread's error (e.g. disk full) in the caller"""
+    if writer_thread is not None and writer_thread['error'] is not None:
+        raise writer_thread['error']
+
+
+def stop_writer_thread(writer_thread):
+    """Wait until every queued batch is written, then end the thread"""
+    writer_thread['queue'].put(None)
+    writer_thread['thread'].join()
+    check_writer_thread(writer_thread)
+
+
+# ==========================================
+# 3. OUTPUT FILES
+# ==========================================
+
+def open_output(path, fieldnames=None, writer_thread=None, buffer_size=BUFFER_SIZE, batch_lines=BATCH_LINES):
+    """
+    Start writing <path>.tmp (the header first, if fieldnames are given)
+    writer_thread: from start_writer_thread() to write in the background
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    output = {
+        'path': path,
+        'temp_path': path + '.tmp',
+        'file': open(path + '.tmp', 'wb', buffering=buffer_size),
+        'writer_thread': writer_thread,
+        'batch_lines': batch_lines,
+        'lines': [],
+        'rows': 0,
+    }
+    if fieldnames is not None:
+        output['lines'].append(join_row(list(fieldnames)))
+    return output
+
+
+def flush_output(output):
+    """Encode the collected lines as one block and write it (or queue it)"""
+    if not output['lines']:
+        return
+    data = ''.join(output['lines']).encode('utf-8')
+    output['lines'] = []
+    _write(output, data)
+
+
+def _write(output, data):
+    writer_thread = output['writer_thread']
+    if writer_thread is None:
+        output['file'].write(data)
+    else:
+        check_writer_thread(writer_thread)
+        writer_thread['queue'].put((output['file'], data))
+
+
+def write_line(output, line):
+    """Add one ready-made line (ending included)"""
+    output['lines'].append(line)
+    output['rows'] += 1
+    if len(output['lines']) >= output['batch_lines']:
+        flush_output(output)
+
+
+def write_row(output, values):
+    """Add one row given as a list of values"""
+    write_line(output, join_row(values))
+
+
+def write_rows(output, rows):
+    for values in rows:
+        write_line(output, join_row(values))
+
+
+def write_data(output, data):
+    """Add raw bytes as they are (a header line, a block copied from another file)"""
+    flush_output(output)
+    _write(output, data)
+
+
+def close_output(output):
+    """Write what is left and rename <path>.tmp to <path> -> rows written"""
+    flush_output(output)
+    writer_thread = output['writer_thread']
+    if writer_thread is not None:
+        writer_thread['queue'].join()   # our batches must be on disk before the rename
+        check_writer_thread(writer_thread)
+    output['file'].close()
+    os.replace(output['temp_path'], output['path'])
+    return output['rows']
+
+
+def abort_output(output):
+    """Something failed - drop the temp file, the old <path> stays untouched"""
+    writer_thread = output['writer_thread']
+    if writer_thread is not None:
+        writer_thread['queue'].join()
+    output['file'].close()
+    if os.path.exists(output['temp_path']):
+        os.remove(output['temp_path'])
+
+
+def write_file(path, data):
+    """
+    Replace a whole small file (reports, JSON checkpoints and catalogs) the
+    same way: data (str = UTF-8, or bytes) goes to <path>.tmp, then the rename
+    """
+    output = open_output(path)
+    try:
+        write_data(output, data.encode('utf-8') if isinstance(data, str) else data)
+    except BaseException:
+        abort_output(output)
+        raise
+    close_output(output)
@@ -0,0 +1,224 @@
+# DAY 4: One-Pass Rule Engine for CSV Files
+# "Warn about small amounts", "save the pending orders", "count orders per
+# service" - written as separate loops, each one reads the whole file again.
+# Here every rule is DECLARED (condition + where its rows go), all rules are
+# compiled into ONE generated Python function, and the file is read once.
+# (Like Laravel validation rules: you declare them, the framework runs them)
+#
+#   rules = [
+#       {'name': 'small_amount', 'where': [('amount', '<', 2000)], 'output': 'small_amount_orders.csv'},
+#       {'name': 'pending', 'where': [('status', '==', 'pending')], 'output': 'pending_orders.csv'},
+#       {'name': 'per_service', 'count_by': 'service_type'},
+#   ]
+#   results = run_rules('orders_data.csv', rules)
+#
+# 'where' is a list of (column, operator, value) that must ALL be true
+# (operators: == != < <= > >= in - 'in' takes a list/tuple/set). Comparing
+# with a number converts the cell to a number - once per row, however many
+# rules use it. No 'where' = every row. A row with a bad number or missing
+# cells only skips the rules that read them.
+
+import csv
+import time
+from collections import Counter
+from functools import partial
+
+from compressed_files import open_text
+from csv_output import open_output, write_row, close_output, abort_output
+
+OPERATORS = ('==', '!=', '<', '<=', '>', '>=', 'in')
+# Rules are timed on 1 row in TIMING_SAMPLE and scaled up - timing every
+# row would cost more than the rules themselves
+TIMING_SAMPLE = 64
+
+
+# ==========================================
+# 1. COMPILING THE RULES
+# ==========================================
+
+def value_type(value):
+    """How a cell must be converted before comparing it with `value`"""
+    values = value if isinstance(value, (list, tuple, set, frozenset)) else [value]
+    if values and all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return 'int'
+    if values and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return 'float'
+    return 'str'
+
+
+def compile_rules(rules, fieldnames):
+    """
+    Generate the source of one function that applies every rule to every row:
+        def apply_rules(rows, outputs, counters, hits, spent): ... -> (rows, bad rows, timed rows)
+    A cell that is missing (short row) or not a number only skips the rules
+    that read it - the other rules still see the row
+    Returns (function, source) - print the source to see what runs
+    """
+    constants = {}
+    conversions = {}   # (column, type) -> variable name, converted once per row
+    width_needed = 0   # a shorter row is missing a cell some rule reads
+
+    def cell(column, kind):
+        """(expression, guard) - the guard is true when the cell can be used"""
+        nonlocal width_needed
+        if column not in fieldnames:
+            raise ValueError(f"rule column '{column}' is not in the CSV header")
+        index = fieldnames.index(column)
+        width_needed = max(width_needed, index + 1)
+        if kind == 'str':
+            return f"row[{index}]", f"width > {index}"
+        if (column, kind) not in conversions:
+            conversions[column, kind] = f"{kind}_{len(conversions)}"
+        name = conversions[column, kind]
+        return name, f"{name} is not None"
+
+    checks = []
+    for number, rule in enumerate(rules):
+        guards = []
+        conditions = []
+        for column, operator, value in rule.get('where', []):
+            if operator not in OPERATORS:
+                raise ValueError(f"rule '{rule['name']}': unknown operator {operator!r}")
+            if operator == 'in' and not isinstance(value, (list, tuple, set, frozenset)):
+                # 'in' with a plain string would match any substring of it
+                raise ValueError(f"rule '{rule['name']}': 'in' needs a list/tuple/set of values, got {value!r}")
+            kind = value_type(value)
+            if operator == 'in':
+                converted = {int(v) if kind == 'int' else float(v) if kind == 'float' else v for v in value}
+                value = frozenset(converted)
+            constant = f"k{len(constants)}"
+            constants[constant] = value
+            expression, guard = cell(column, kind)
+            if guard not in guards:
+                guards.append(guard)
+            conditions.append(f"{expression} {operator} {constant}")
+
+        actions = [f"hits[{number}] += 1"]
+        if rule.get('output'):
+            actions.append(f"outputs[{number}](row)")
+        if rule.get('count_by'):
+            expression, guard = cell(rule['count_by'], 'str')
+            if guard not in guards:
+                guards.append(guard)
+            actions.append(f"counters[{number}][{expression}] += 1")
+        checks.append((" and ".join(guards + conditions) or "True", actions))
+
+    def body(timed):
+        lines = []
+        if timed:
+            lines.append("timed_rows += 1")
+        for number, (condition, actions) in enumerate(checks):
+            if timed:
+                lines.append("started = perf_counter_ns()")
+            lines.append(f"if {condition}:")
+            lines.extend("    " + action for action in actions)
+            if timed:
+                lines.append(f"spent[{number}] += perf_counter_ns() - started")
+        return lines
+
+    source = ["def apply_rules(rows, outputs, counters, hits, spent):",
+              "    line = -1",
+              "    bad_rows = 0",
+              "    timed_rows = 0",
+              "    for line, row in enumerate(rows):",
+              "        if not row:",
+              "            continue",
+              "        width = len(row)",
+              f"        bad = width < {width_needed}"]
+    for (column, kind), name in conversions.items():
+        source.append("        try:")
+        source.append(f"            {name} = {kind}(row[{fieldnames.index(column)}])")
+        source.append("        except (ValueError, IndexError):")
+        source.append(f"            {name} = None")
+        source.append("            bad = True")
+    source.append("        if bad:")
+    source.append("            bad_rows += 1")
+    source.append(f"        if line % {TIMING_SAMPLE}:")
+    source.extend("            " + line for line in body(timed=False))
+    source.append("        else:")
+    source.extend("            " + line for line in body(timed=True))
+    source.append("    return line + 1, bad_rows, timed_rows")
+    source = "\n".join(source) + "\n"
+
+    namespace = dict(constants, perf_counter_ns=time.perf_counter_ns)
+    exec(compile(source, '<csv_rules>', 'exec'), namespace)
+    return namespace['apply_rules'], source
+
+
+# ==========================================
+# 2. RUNNING THEM (ONE SCAN)
+# ==========================================
+
+def timer_overhead_ns():
+    """What one perf_counter_ns() pair costs by itself (subtracted from rule timings)"""
+    perf_counter_ns = time.perf_counter_ns
+    samples = []
+    for _ in range(1000):
+        started = perf_counter_ns()
+        samples.append(perf_counter_ns() - started)
+    return sorted(samples)[len(samples) // 2]
+
+
+def run_rules(path, rules):
+    """
+    Read the CSV once, apply every rule to every row
+    Rows of a rule with 'output' are written (with header) to that CSV file
+    Returns {'rows', 'bad_rows', 'seconds', 'rules': [{'name', 'hits', 'seconds', 'counts', 'output'}]}
+    """
+    outputs = {}
+    files = []   # csv_output files, renamed into place at the end
+    try:
+        with open_text(path) as file:
+            reader = csv.reader(file)
+            fieldnames = next(reader, [])
+            apply_rules, _ = compile_rules(rules, fieldnames)
+
+            for number, rule in enumerate(rules):
+                if rule.get('output'):
+                    output = open_output(rule['output'], fieldnames)
+                    files.append(output)
+                    outputs[number] = partial(write_row, output)
+            counters = {number: Counter() for number, rule in enumerate(rules) if rule.get('count_by')}
+            hits = [0] * len(rules)
+            spent = [0] * len(rules)
+
+            started = time.perf_counter()
+            rows, bad_rows, timed_rows = apply_rules(reader, outputs, counters, hits, spent)
+            seconds = time.perf_counter() - started
+    except BaseException:
+        for output in files:
+            abort_output(output)
+        raise
+
+    for output in files:
+        close_output(output)
+
+    overhead = timer_overhead_ns() * timed_rows
+    return {
+        'rows': rows,
+        'bad_rows': bad_rows,
+        'seconds': seconds,
+        'rules': [{
+            'name': rule['name'],
+            'hits': hits[number],
+            # Estimated from the sampled rows
+            'seconds': max(spent[number] - overhead, 0) * rows / timed_rows / 1e9 if timed_rows else 0.0,
+            'counts': dict(counters[number]) if number in counters else None,
+            'output': rule.get('output'),
+        } for number, rule in enumerate(rules)],
+    }
+
+
+def rule_report_lines(results):
+    """Hit counts and (estimated) time per rule, for printing"""
+    lines = [f"{results['rows']} rows scanned once in {results['seconds'] * 1000:.1f} ms"
+             + (f" ({results['bad_rows']} row(s) with missing cells or unreadable numbers - "
+                f"skipped by the rules that read them)" if results['bad_rows'] else "")]
+    for rule in results['rules']:
+        line = f"{rule['name']}: {rule['hits']} hit(s), ~{rule['seconds'] * 1000:.2f} ms"
+        if rule['output']:
+            line += f" -> {rule['output']}"
+        lines.append(line)
+        for value, count in sorted((rule['counts'] or {}).items()):
+            lines.append(f"    {value}: {count}")
+    return lines
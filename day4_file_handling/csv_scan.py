@@ -0,0 +1,94 @@
+# DAY 4: Memory-Mapped CSV Scanning
+# To find the 'completed' orders, the usual loop decodes and splits EVERY
+# line first. Here the file is memory-mapped and searched as raw bytes for
+# the value we want. Only lines that contain it (the candidates) are
+# decoded and parsed, and the real column check runs on those only.
+# (Like using a database index: look up matches first, read rows second)
+#
+# Assumes one order per line (no line breaks inside quoted fields).
+# Compressed files cannot be memory-mapped: they are decompressed on the fly
+# and the same "search first, parse second" trick runs on each text line.
+
+import csv
+import mmap
+
+from compressed_files import detect_compression, open_text
+
+
+# ==========================================
+# 1. RAW BYTE SEARCH
+# ==========================================
+
+def candidate_lines(mm, needle, start):
+    """
+    Yield (line start, line end) of every line from `start` on that
+    contains `needle` somewhere - found with mmap.find(), no decoding
+    """
+    position = mm.find(needle, start)
+    while position != -1:
+        line_start = mm.rfind(b'\n', 0, position) + 1
+        line_end = mm.find(b'\n', position)
+        if line_end == -1:
+            line_end = len(mm)
+        yield line_start, line_end
+        # Continue after this line - a line is reported once
+        position = mm.find(needle, line_end + 1)
+
+
+def scan_matches(path, column, value):
+    """
+    Yield (fieldnames, raw line, parsed row) for every line where column == value
+    The raw line has no line ending
+    """
+    if detect_compression(path):
+        yield from scan_compressed(path, column, value)
+        return
+
+    with open(path, 'rb') as file:
+        if file.seek(0, 2) == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header_end = mm.find(b'\n')
+            if header_end == -1:
+                return
+            fieldnames = next(csv.reader([mm[:header_end].decode('utf-8')]))
+            index = fieldnames.index(column)
+
+            # Quotes inside a value are doubled in the file
+            needle = value.replace('"', '""').encode('utf-8')
+            for line_start, line_end in candidate_lines(mm, needle, header_end + 1):
+                line = mm[line_start:line_end].rstrip(b'\r')
+                row = next(csv.reader([line.decode('utf-8')]), None)
+                # The value may sit in another column - check the real one
+                if row and len(row) > index and row[index] == value:
+                    yield fieldnames, line, row
+
+
+def scan_compressed(path, column, value):
+    """scan_matches() for .gz/.bz2/.xz files - substring test before parsing"""
+    with open_text(path) as file:
+        fieldnames = next(csv.reader([file.readline()]), [])
+        index = fieldnames.index(column)
+        needle = value.replace('"', '""')
+        for text in file:
+            if needle not in text:
+                continue
+            row = next(csv.reader([text]), None)
+            if row and len(row) > index and row[index] == value:
+                yield fieldnames, text.rstrip('\r\n').encode('utf-8'), row
+
+
+# ==========================================
+# 2. DROP-IN HELPERS
+# ==========================================
+
+def scan_lines(path, column, value):
+    """Raw bytes of matching lines - copy them to another file without decoding"""
+    for _, line, _ in scan_matches(path, column, value):
+        yield line
+
+
+def scan_dicts(path, column, value):
+    """Like DictReader + `if order[column] == value`, but only candidate lines are parsed"""
+    for fieldnames, _, row in scan_matches(path, column, value):
+        yield dict(zip(fieldnames, row))
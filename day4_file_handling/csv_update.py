@@ -0,0 +1,196 @@
+# DAY 4: Bulk Updates on Big CSV Files
+# "Change every 'pending' to 'processing'" usually means: read the whole
+# file into a list, change it, write it all back. For multi-GB files:
+#
+#   - rewrite_csv(): stream the rows through a function into a temp file
+#     (big buffers), then swap it in (csv_output.py's open/close_output)
+#   - replace_value(): when the new value has the SAME byte length as the
+#     old one ('pending' -> 'on_hold'), the bytes are patched in place
+#     through mmap - nothing is copied, only the touched pages are written.
+#     Otherwise only the changed lines are re-encoded; all other lines are
+#     copied byte for byte.
+# (Like Laravel's Order::where('status', 'pending')->update([...]) - one
+# bulk statement instead of load, modify, save for every model)
+#
+# Assumes one row per line (no line breaks inside quoted fields).
+
+import csv
+import io
+import mmap
+import os
+import shutil
+
+from compressed_files import detect_compression
+from csv_output import open_output, close_output, abort_output
+from csv_scan import candidate_lines
+
+BUFFER_SIZE = 1024 * 1024
+# Values containing these bytes need quoting, so they can't be patched in place
+SPECIAL_BYTES = b'",\r\n'
+
+
+# ==========================================
+# 1. STREAMING REWRITE (ANY CHANGE)
+# ==========================================
+
+def require_plain_file(path):
+    if detect_compression(path):
+        raise ValueError(f"{path} is compressed - decompress it before updating it")
+
+
+def replace_with_temp(path, write):
+    """
+    Call write(temp_file) and put the result in place of path
+    (a csv_output file - the temp file keeps the original permissions)
+    """
+    output = open_output(path, buffer_size=BUFFER_SIZE)
+    try:
+        result = write(output['file'])
+        shutil.copymode(path, output['temp_path'])
+    except BaseException:
+        abort_output(output)
+        raise
+    close_output(output)
+    return result
+
+
+def rewrite_csv(path, transform):
+    """
+    Stream every data row (list of strings) through transform(row), which
+    returns the new row, or None to drop it - then replace the file atomically
+    Returns {'rows', 'changed', 'dropped'}
+    """
+    require_plain_file(path)
+    counts = {'rows': 0, 'changed': 0, 'dropped': 0}
+
+    def write(out):
+        with open(path, 'r', newline='', buffering=BUFFER_SIZE) as source:
+            header_line = source.readline()
+            # Keep the file's own line ending ('\r\n' from csv.writer, or '\n')
+            ending = '\r\n' if header_line.endswith('\r\n') else '\n'
+            text_out = io.TextIOWrapper(out, encoding='utf-8', newline='', write_through=True)
+            text_out.write(header_line)
+            writer = csv.writer(text_out, lineterminator=ending)
+            for row in csv.reader(source):
+                if not row:
+                    continue
+                counts['rows'] += 1
+                new_row = transform(list(row))
+                if new_row is None:
+                    counts['dropped'] += 1
+                    continue
+                if new_row != row:
+                    counts['changed'] += 1
+                writer.writerow(new_row)
+            text_out.detach()   # leave `out` open for replace_with_temp()
+
+    replace_with_temp(path, write)
+    return counts
+
+
+# ==========================================
+# 2. REPLACING ONE VALUE IN ONE COLUMN
+# ==========================================
+
+def field_span(line, index):
+    """
+    (start, end) byte offsets of field number `index` in a raw CSV line
+    (quotes included), or None if the line is too short or malformed
+    """
+    position = 0
+    for field in range(index + 1):
+        if line[position:position + 1] == b'"':
+            end = position + 1
+            while True:
+                end = line.find(b'"', end)
+                if end == -1:
+                    return None
+                if line[end + 1:end + 2] == b'"':   # "" = an escaped quote
+                    end += 2
+                    continue
+                end += 1
+                break
+            if end < len(line) and line[end:end + 1] != b',':
+                return None
+        else:
+            end = line.find(b',', position)
+            if end == -1:
+                end = len(line)
+        if field == index:
+            return position, end
+        if end >= len(line):
+            return None
+        position = end + 1
+
+
+def patch_in_place(path, index, old, new):
+    """Overwrite every `old` in column `index` with `new` (same length) through mmap"""
+    changed = 0
+    with open(path, 'r+b') as file:
+        if file.seek(0, 2) == 0:
+            return 0
+        with mmap.mmap(file.fileno(), 0) as mm:
+            header_end = mm.find(b'\n')
+            if header_end == -1:
+                return 0
+            for line_start, line_end in candidate_lines(mm, old, header_end + 1):
+                line = mm[line_start:line_end].rstrip(b'\r')
+                span = field_span(line, index)
+                if span is None:
+                    continue
+                start, end = span
+                if line[start:end] == b'"' + old + b'"':
+                    start += 1
+                elif line[start:end] != old:
+                    continue
+                mm[line_start + start:line_start + start + len(new)] = new
+                changed += 1
+            mm.flush()
+    # mmap writes don't always bump the modification time - caches
+    # (csv_cache.py) compare it, so touch the file ourselves
+    os.utime(path)
+    return changed
+
+
+def rewrite_lines(path, index, old, new):
+    """Different length: copy the file, re-encoding only the lines that change"""
+    text_old, text_new = old.decode('utf-8'), new.decode('utf-8')
+    needle = old.replace(b'"', b'""')   # quotes are doubled inside the file
+
+    def write(out):
+        changed = 0
+        with open(path, 'rb', buffering=BUFFER_SIZE) as source:
+            out.write(source.readline())
+            for line in source:
+                if needle in line:
+                    body = line.rstrip(b'\r\n')
+                    row = next(csv.reader([body.decode('utf-8')]), None)
+                    if row and len(row) > index and row[index] == text_old:
+                        row[index] = text_new
+                        buffer = io.StringIO()
+                        csv.writer(buffer, lineterminator='').writerow(row)
+                        line = buffer.getvalue().encode('utf-8') + line[len(body):]
+                        changed += 1
+                out.write(line)
+        return changed
+
+    return replace_with_temp(path, write)
+
+
+def replace_value(path, column, old, new):
+    """
+    Set column = new on every row where column == old
+    Returns (rows changed, 'in place' or 'rewritten')
+    """
+    require_plain_file(path)
+    with open(path, 'r', newline='') as file:
+        fieldnames = next(csv.reader([file.readline()]), [])
+    if column not in fieldnames:
+        raise ValueError(f"no column '{column}' in {path}")
+    index = fieldnames.index(column)
+
+    old_bytes, new_bytes = old.encode('utf-8'), new.encode('utf-8')
+    simple = not any(byte in SPECIAL_BYTES for byte in old_bytes + new_bytes)
+    if old_bytes and simple and len(old_bytes) == len(new_bytes):
+        return patch_in_place(path, index, old_bytes, new_bytes), 'in place'
+    return rewrite_lines(path, index, old_bytes, new_bytes), 'rewritten'
@@ -0,0 +1,151 @@
+# DAY 4: A Catalog for Folders Full of CSV Files
+# With hundreds of daily order drops per branch, "open every file to see
+# what's inside" gets slow. The catalog remembers, per file:
+#   size, modification time, row count, column names, first and last date
+# and saves it as JSON. Next time only new or changed files are read again.
+# A query for one week can then skip every file whose dates can't match,
+# without opening it. (Like a database keeping min/max statistics per
+# partition so the query planner can prune partitions)
+
+import csv
+import fnmatch
+import json
+import os
+
+from compressed_files import open_text
+from csv_cache import file_signature
+from csv_output import write_file
+from process_pool import process_pool
+
+CATALOG_VERSION = 1
+CATALOG_FILE = '.file_catalog.json'
+CSV_PATTERNS = ('*.csv', '*.csv.gz', '*.csv.bz2', '*.csv.xz')
+
+
+# ==========================================
+# 1. ONE FILE
+# ==========================================
+
+def scan_file(path, date_column='date'):
+    """
+    Read a CSV once and describe it:
+    {'signature', 'size', 'rows', 'fieldnames', 'min_date', 'max_date'}
+    Dates are compared as 'YYYY-MM-DD' strings (text order == date order)
+    """
+    signature = list(file_signature(path))   # list: it is stored as JSON
+    rows = 0
+    min_date = max_date = None
+    with open_text(path) as file:
+        reader = csv.reader(file)
+        fieldnames = next(reader, [])
+        index = fieldnames.index(date_column) if date_column in fieldnames else None
+        for row in reader:
+            if not row:
+                continue
+            rows += 1
+            if index is not None and index < len(row) and row[index]:
+                day = row[index]
+                if min_date is None or day < min_date:
+                    min_date = day
+                if max_date is None or day > max_date:
+                    max_date = day
+    return {'signature': signature, 'size': signature[0], 'rows': rows, 'fieldnames': fieldnames,
+            'min_date': min_date, 'max_date': max_date}
+
+
+def scan_task(task):
+    """Worker: (relative path, full path, date column) -> (relative path, entry)"""
+    name, path, date_column = task
+    return name, scan_file(path, date_column)
+
+
+# ==========================================
+# 2. THE CATALOG
+# ==========================================
+
+def find_files(root, patterns=CSV_PATTERNS):
+    """Relative paths of matching files anywhere under root, sorted"""
+    found = []
+    for folder, _, files in os.walk(root):
+        for file_name in files:
+            if any(fnmatch.fnmatch(file_name, pattern) for pattern in patterns):
+                found.append(os.path.relpath(os.path.join(folder, file_name), root))
+    return sorted(found)
+
+
+def load_catalog(catalog_file):
+    """The saved catalog, or None if there is none (or it is from an older version)"""
+    try:
+        with open(catalog_file, 'r', encoding='utf-8') as file:
+            catalog = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+    return catalog if catalog.get('version') == CATALOG_VERSION else None
+
+
+def save_catalog(catalog_file, catalog):
+    write_file(catalog_file, json.dumps(catalog, indent=1))
+
+
+def update_catalog(root, catalog_file=None, patterns=CSV_PATTERNS, date_column='date', workers=None):
+    """
+    Bring the catalog of `root` up to date and save it
+    Unchanged files keep their cached entry, new/changed ones are scanned
+    (in parallel), deleted ones are dropped
+    Returns (catalog, number of files scanned)
+    """
+    catalog_file = catalog_file or os.path.join(root, CATALOG_FILE)
+    old = load_catalog(catalog_file)
+    old_files = old['files'] if old and old.get('date_column') == date_column else {}
+
+    files = {}
+    tasks = []
+    for name in find_files(root, patterns):
+        path = os.path.join(root, name)
+        entry = old_files.get(name)
+        if entry is not None and entry['signature'] == list(file_signature(path)):
+            files[name] = entry
+        else:
+            tasks.append((name, path, date_column))
+
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        with process_pool(workers) as pool:
+            files.update(pool.map(scan_task, tasks))
+    else:
+        files.update(map(scan_task, tasks))
+
+    catalog = {'version': CATALOG_VERSION, 'date_column': date_column,
+               'files': {name: files[name] for name in sorted(files)}}
+    save_catalog(catalog_file, catalog)
+    return catalog, len(tasks)
+
+
+# ==========================================
+# 3. QUERYING THE CATALOG
+# ==========================================
+
+def select_files(catalog, pattern='*', first_day=None, last_day=None):
+    """
+    Files matching a glob (on the relative path, e.g. 'lahore/*.csv') whose
+    date range overlaps [first_day, last_day] -> (names, names skipped by date)
+    Files without dates are never skipped - we can't tell what's inside
+    """
+    selected = []
+    skipped = []
+    for name, entry in catalog['files'].items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        if entry['min_date'] is not None and (
+                (last_day and entry['min_date'] > last_day) or (first_day and entry['max_date'] < first_day)):
+            skipped.append(name)
+            continue
+        selected.append(name)
+    return selected, skipped
+
+
+def catalog_totals(catalog, names=None):
+    """Rows and bytes of the given files (default: all) - no file is opened"""
+    entries = [catalog['files'][name] for name in (names if names is not None else catalog['files'])]
+    return {'files': len(entries), 'rows': sum(entry['rows'] for entry in entries),
+            'bytes': sum(entry['size'] for entry in entries)}
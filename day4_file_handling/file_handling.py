@@ -6,7 +6,17 @@ print("DAY 4: File Handling & CSV Operations")
 print("=" * 60)
 
 import csv
+import gzip
 import os
+import shutil
+from csv_cache import read_rows, read_dicts, cache_stats
+from csv_scan import scan_dicts
+from csv_rules import run_rules, rule_report_lines
+from csv_update import replace_value
+from csv_output import open_output, write_rows, close_output
+from typed_csv import read_typed
+from tail_follow import open_tail, poll_tail, close_tail
+from file_catalog import update_catalog, catalog_totals
 
 # ==========================================
 # 1. BASIC FILE OPERATIONS
@@ -45,15 +55,21 @@ with open(sample_file, 'r') as file:
 print("\n\n2. WRITING TO FILES:")
 print("-" * 60)
 
+# Remember where the file ends now (see tail_follow.py)
+tail = open_tail(sample_file, offset=os.path.getsize(sample_file))
+
 # Append mode (add to existing file)
 with open(sample_file, 'a') as file:
     file.write("Order #004: Mobile service in Rawalpindi\n")
 
 print(f"✓ Appended line to {sample_file}")
 
-# Read updated file
-with open(sample_file, 'r') as file:
-    print(f"\nUpdated content:\n{file.read()}")
+# Read ONLY what was appended - no need to re-read the whole file
+new_lines, _ = poll_tail(tail)
+close_tail(tail)
+print(f"\nNew lines since last read:")
+for line in new_lines:
+    print(f"  {line.decode('utf-8').strip()}")
 
 
 # ==========================================
@@ -83,19 +99,20 @@ with open(csv_file, 'w', newline='') as file:
 
 print(f"✓ Created {csv_file} with {len(orders_data)-1} orders")
 
+# The readers below share ONE parse of the file (see csv_cache.py):
+#   read_rows()  works like csv.reader()
+#   read_dicts() works like csv.DictReader()
+# The file is only parsed again if it changes on disk.
+
 # Read CSV file - Method 1: Using csv.reader
 print(f"\n📖 Reading CSV with csv.reader():")
-with open(csv_file, 'r') as file:
-    reader = csv.reader(file)
-    for row_num, row in enumerate(reader, 1):
-        print(f"  Row {row_num}: {row}")
+for row_num, row in enumerate(read_rows(csv_file), 1):
+    print(f"  Row {row_num}: {row}")
 
 # Read CSV file - Method 2: Using csv.DictReader (more convenient!)
 print(f"\n📖 Reading CSV with csv.DictReader() (as dictionaries):")
-with open(csv_file, 'r') as file:
-    reader = csv.DictReader(file)
-    for order in reader:
-        print(f"  Order #{order['order_id']}: {order['customer_name']} - Rs.{order['amount']} ({order['status']})")
+for order in read_dicts(csv_file):
+    print(f"  Order #{order['order_id']}: {order['customer_name']} - Rs.{order['amount']} ({order['status']})")
 
 
 # ==========================================
@@ -106,30 +123,50 @@ print("\n\n4. FILTER & SAVE CSV DATA:")
 print("-" * 60)
 
 # Read and filter completed orders
-completed_orders = []
-
-with open(csv_file, 'r') as file:
-    reader = csv.DictReader(file)
-    for order in reader:
-        if order['status'] == 'completed':
-            completed_orders.append(order)
+# scan_dicts() searches the raw file bytes for 'completed' first and only
+# parses those lines (see csv_scan.py) - same result as:
+#   for order in csv.DictReader(file):
+#       if order['status'] == 'completed': ...
+completed_orders = list(scan_dicts(csv_file, 'status', 'completed'))
 
 print(f"\n✓ Found {len(completed_orders)} completed orders")
 
 # Write filtered results to new file
+# open_output() writes completed_orders.csv.tmp in big batches and renames
+# it at the end (see csv_output.py) - same bytes as csv.DictWriter
 completed_csv = "completed_orders.csv"
 if completed_orders:
-    with open(completed_csv, 'w', newline='') as file:
-        fieldnames = completed_orders[0].keys()
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(completed_orders)
+    fieldnames = list(completed_orders[0].keys())
+    output = open_output(completed_csv, fieldnames)
+    write_rows(output, ([order[name] for name in fieldnames] for order in completed_orders))
+    close_output(output)
 
     print(f"✓ Saved to {completed_csv}")
     print(f"\nCompleted orders:")
     for order in completed_orders:
         print(f"  - Order #{order['order_id']}: {order['customer_name']} - Rs.{order['amount']}")
 
+# Several checks at once: each rule says which rows it wants and where they go.
+# All rules are compiled into one function and the file is read ONCE
+# (see csv_rules.py) instead of one loop per check
+rules = [
+    {'name': 'small_amount', 'where': [('amount', '<', 2000)], 'output': 'small_amount_orders.csv'},
+    {'name': 'pending', 'where': [('status', '==', 'pending')], 'output': 'pending_orders.csv'},
+    {'name': 'per_service', 'count_by': 'service_type'},
+]
+print(f"\n⚙️  Rule engine:")
+for line in rule_report_lines(run_rules(csv_file, rules)):
+    print(f"  {line}")
+
+# Bulk status update without loading the file (see csv_update.py) - on a copy,
+# so orders_data.csv stays as it is for the next sections
+update_csv = "orders_status_update.csv"
+shutil.copyfile(csv_file, update_csv)
+changed, how = replace_value(update_csv, 'status', 'pending', 'processing')
+print(f"\n✏️  {update_csv}: {changed} 'pending' -> 'processing' ({how}: length changed, streamed to a temp file)")
+changed, how = replace_value(update_csv, 'status', 'processing', 'dispatched')
+print(f"✏️  {update_csv}: {changed} 'processing' -> 'dispatched' ({how}: same length, bytes patched via mmap)")
+
 
 # ==========================================
 # 5. CALCULATE TOTALS FROM CSV
@@ -142,18 +179,16 @@ total_revenue = 0
 order_count = 0
 city_totals = {}
 
-with open(csv_file, 'r') as file:
-    reader = csv.DictReader(file)
-    for order in reader:
-        amount = int(order['amount'])
-        city = order['city']
+for order in read_dicts(csv_file):
+    amount = int(order['amount'])
+    city = order['city']
 
-        total_revenue += amount
-        order_count += 1
+    total_revenue += amount
+    order_count += 1
 
-        if city not in city_totals:
-            city_totals[city] = 0
-        city_totals[city] += amount
+    if city not in city_totals:
+        city_totals[city] = 0
+    city_totals[city] += amount
 
 print(f"\n📊 Revenue Statistics:")
 print(f"  Total Orders: {order_count}")
@@ -164,6 +199,27 @@ print(f"\n📊 Revenue by City:")
 for city, revenue in sorted(city_totals.items()):
     print(f"  {city}: Rs.{revenue}")
 
+# Three cached reads of orders_data.csv above - but only one real parse
+stats = cache_stats()
+print(f"\n📦 Parse cache: parsed {stats['parses']} time(s), reused {stats['hits']} time(s)")
+
+# Compressed files are read the same way - no unzipping to disk first
+# (csv_cache.py opens them through compressed_files.open_text())
+gz_file = csv_file + ".gz"
+with open(csv_file, 'rb') as source, gzip.open(gz_file, 'wb') as target:
+    shutil.copyfileobj(source, target)
+gz_orders = list(read_dicts(gz_file))
+print(f"📦 Read {len(gz_orders)} orders straight from {gz_file} ({os.path.getsize(gz_file)} bytes compressed)")
+
+# Typed reader: a schema converts cells while parsing (see typed_csv.py),
+# so there is no int(order['amount']) afterwards - bad cells are reported, not raised
+order_schema = [("order_id", "int"), ("city", "category"), ("amount", "int"),
+                ("status", ("completed", "pending", "in_progress", "cancelled"))]
+bad_cells = []
+typed_orders = list(read_typed(csv_file, order_schema, bad_cells))
+print(f"🔢 Typed rows like {typed_orders[0]}: total Rs.{sum(amount for _, _, amount, _ in typed_orders)}, "
+      f"{len(bad_cells)} bad cell(s)")
+
 
 # ==========================================
 # 6. WORKING WITH FILE PATHS
@@ -186,6 +242,21 @@ for file in os.listdir('.'):
     if file.endswith('.csv') or file.endswith('.txt'):
         print(f"    - {file}")
 
+# For folders with hundreds of CSV drops, a catalog remembers rows, columns
+# and date ranges per file - only new or changed files are read again
+# (see file_catalog.py). It walks a whole folder tree, so it gets a folder of
+# its own with this lesson's files - not '.', which could be the repo root
+drops_dir = "order_drops"
+os.makedirs(drops_dir, exist_ok=True)
+for drop in (csv_file, gz_file, "pending_orders.csv"):
+    shutil.copy2(drop, drops_dir)
+catalog, scanned = update_catalog(drops_dir)
+totals = catalog_totals(catalog)
+print(f"\n  Catalog: {totals['files']} CSV file(s), {totals['rows']} rows, {totals['bytes']} bytes "
+      f"({scanned} file(s) scanned this run)")
+for name, entry in catalog['files'].items():
+    print(f"    - {name}: {entry['rows']} rows, columns: {', '.join(entry['fieldnames'])}")
+
 
 # ==========================================
 # 7. ERROR HANDLING WITH FILES
@@ -225,8 +296,9 @@ Exercise 2: Create a Summary Report
 
 Exercise 3: Data Validation
   TODO: Read orders_data.csv
-  TODO: Find any orders with amount < 1000
-  TODO: Create a warning_orders.csv with suspicious amounts
+  TODO: Find any orders with amount < 2000
+  TODO: Create a small_amount_orders.csv with those orders
+  (Section 4's rule engine does it in one rule - try it with DictReader/DictWriter)
 
 Exercise 4: Update Status
   TODO: Read orders_data.csv
@@ -0,0 +1,23 @@
+# DAY 4: Process Pools for File Work
+# Every parallel reader (gzip members, the file catalog, Day 7's order
+# engine) starts its workers the same way: with the 'fork' start method
+# where the OS has it. A forked worker starts as a copy of the running
+# process - with 'spawn' (the default on Windows/macOS) every worker would
+# import the calling script again, and a script without
+# `if __name__ == '__main__':` would run all over again in each worker.
+# (Like Laravel's queue workers booting the app once, not per job)
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+def worker_context():
+    """The 'fork' multiprocessing context, or None (= the default) where there is none"""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def process_pool(workers):
+    """ProcessPoolExecutor with `workers` processes, forked where possible"""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=worker_context())
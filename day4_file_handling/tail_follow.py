@@ -0,0 +1,128 @@
+# DAY 4: Following a Growing File (like `tail -F`)
+# Log files only ever get lines appended at the end. Instead of re-reading
+# the whole file after every write, remember WHERE we stopped (byte offset)
+# and WHICH file it was (inode), and next time read only what is new.
+#   - only complete lines are returned; a half-written last line waits
+#     until its newline arrives
+#   - rotation (file renamed, new file created at the same path): the rest
+#     of the old file is read first, then the new file from its start
+#   - truncation (file emptied or rewritten shorter): start again at 0
+# (Like Laravel's `php artisan pail` / `tail -f storage/logs/laravel.log`)
+
+import os
+import time
+
+# Most bytes returned by one poll - a huge backlog comes in several batches
+MAX_POLL_BYTES = 8 * 1024 * 1024
+
+
+# ==========================================
+# 1. TAIL STATE
+# ==========================================
+
+def open_tail(path, offset=0, inode=None):
+    """
+    Start following path at byte `offset`
+    Pass the inode saved last time: if the path is now a different file
+    (it was rotated while we were away) reading starts at 0 instead
+    """
+    file = open(path, 'rb')
+    info = os.fstat(file.fileno())
+    if (inode is not None and info.st_ino != inode) or info.st_size < offset:
+        offset = 0
+    # last_line: the last line returned, to notice a file rewritten past our offset
+    return {'path': path, 'file': file, 'inode': info.st_ino, 'offset': offset, 'last_line': None}
+
+
+def tail_position(tail):
+    """What to save so a restart can continue: {'offset', 'inode'}"""
+    return {'offset': tail['offset'], 'inode': tail['inode']}
+
+
+def close_tail(tail):
+    tail['file'].close()
+
+
+def read_complete_lines(tail, max_bytes=MAX_POLL_BYTES, final=False):
+    """
+    Complete lines after tail['offset'] (at most ~max_bytes), offset moves past them
+    final=True also returns a last line without newline (the file is done)
+    """
+    file = tail['file']
+    file.seek(tail['offset'])
+    data = file.read(max_bytes)
+    if len(data) == max_bytes and not data.endswith(b'\n'):
+        data += file.readline()   # finish the line we cut in half
+    end = len(data) if final else data.rfind(b'\n') + 1
+    tail['offset'] += end
+    lines = data[:end].splitlines(keepends=True)
+    if lines:
+        tail['last_line'] = lines[-1]
+    return lines
+
+
+def was_rewritten(tail):
+    """
+    Are the bytes before our offset still the last line we read?
+    Catches a file truncated and refilled past the offset between two polls
+    (its size alone looks like normal growth)
+    """
+    last_line = tail['last_line']
+    if not last_line:
+        return False
+    file = tail['file']
+    file.seek(tail['offset'] - len(last_line))
+    return file.read(len(last_line)) != last_line
+
+
+# ==========================================
+# 2. POLLING
+# ==========================================
+
+def poll_tail(tail, max_bytes=MAX_POLL_BYTES):
+    """
+    New complete lines since the last poll -> (lines, event)
+    event: None, 'rotated' (now reading a new file) or 'truncated' (restarted at 0)
+    The path is checked BEFORE every read, not only when nothing new arrived -
+    otherwise rows written to a truncated/rotated file could be read as if
+    they continued the old one
+    """
+    try:
+        info = os.stat(tail['path'])
+    except FileNotFoundError:
+        info = None   # rotated away, new file not created yet - keep reading the old one
+
+    if info is not None and info.st_ino != tail['inode']:
+        # Rotated: whatever the old file still had is its final content
+        lines = read_complete_lines(tail, max_bytes=-1, final=True)
+        close_tail(tail)
+        tail.update(open_tail(tail['path']))
+        return lines + read_complete_lines(tail, max_bytes), 'rotated'
+
+    if info is not None and (info.st_size < tail['offset'] or was_rewritten(tail)):
+        tail['offset'] = 0
+        tail['last_line'] = None
+        return read_complete_lines(tail, max_bytes), 'truncated'
+
+    return read_complete_lines(tail, max_bytes), None
+
+
+def follow(tail, poll_interval=1.0, idle_polls=None):
+    """
+    Yield (lines, event, position) every time new lines show up - forever, or
+    until `idle_polls` polls in a row found nothing (handy for scripts and tests)
+    position is tail_position() right after `lines` - save it to resume later
+    Takes an open_tail() so nothing appended in between is missed; closes it at the end
+    """
+    idle = 0
+    try:
+        while idle_polls is None or idle < idle_polls:
+            lines, event = poll_tail(tail)
+            if lines or event:
+                idle = 0
+                yield lines, event, tail_position(tail)
+                continue
+            idle += 1
+            time.sleep(poll_interval)
+    finally:
+        close_tail(tail)
@@ -0,0 +1,111 @@
+# DAY 5: Benchmark - Row-by-Row vs Batched INSERTs
+# Inserts synthetic windshield orders into a scratch table
+# (windshield_orders_bench, same columns as windshield_orders) with
+# bulk_insert() at batch sizes from 1 to 10,000 and prints rows/sec.
+# Batch size 1 is the old "cursor.execute() per row" loop.
+#
+#   python day5_mysql/benchmark_inserts.py
+#   python day5_mysql/benchmark_inserts.py --rows 200000 --batch-sizes 1 100 10000 --methods values
+#
+# Uses the same .env settings as mysql_basics.py. Run it against a LOCAL
+# server - over a real network the small batches look even worse.
+
+import argparse
+import json
+import random
+import sys
+from datetime import datetime
+
+from bulk_insert import bulk_insert, METHODS
+from db_pool import db_settings, connect_with_backoff
+
+BENCH_TABLE = 'windshield_orders_bench'
+ORDER_COLUMNS = ('customer_name', 'email', 'phone', 'service_type', 'city', 'amount', 'status', 'technician_name')
+
+create_bench_table = f"""
+CREATE TABLE IF NOT EXISTS {BENCH_TABLE} (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    customer_name VARCHAR(100) NOT NULL,
+    email VARCHAR(100),
+    phone VARCHAR(20),
+    service_type ENUM('windshield_replacement', 'windshield_repair') NOT NULL,
+    city VARCHAR(50) NOT NULL,
+    amount INT NOT NULL,
+    status ENUM('pending', 'in_progress', 'completed', 'cancelled') DEFAULT 'pending',
+    technician_name VARCHAR(100),
+    notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_status (status),
+    INDEX idx_city (city),
+    INDEX idx_customer (customer_name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+"""
+
+CITIES = ["Lahore", "Karachi", "Islamabad", "Rawalpindi", "Faisalabad", "Multan"]
+STATUSES = ["completed", "pending", "in_progress", "cancelled"]
+SERVICES = [("windshield_replacement", [3500, 3800, 4200]), ("windshield_repair", [1200, 1500, 1800])]
+TECHNICIANS = ["Ahmed", "Hassan", "Bilal", "Usman", "Imran"]
+
+
+def synthetic_orders(count, seed=5):
+    """`count` order tuples in ORDER_COLUMNS order"""
+    rng = random.Random(seed)
+    orders = []
+    for number in range(1, count + 1):
+        service, amounts = rng.choice(SERVICES)
+        orders.append((f"Customer {number}", f"customer{number}@email.com", f"0300-{number % 10_000_000:07d}",
+                       service, rng.choice(CITIES), rng.choice(amounts), rng.choice(STATUSES),
+                       rng.choice(TECHNICIANS)))
+    return orders
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched INSERTs into MySQL")
+    parser.add_argument('--rows', type=int, default=50_000, help="rows per run")
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 10, 100, 1000, 10_000])
+    parser.add_argument('--methods', nargs='+', choices=METHODS, default=list(METHODS))
+    parser.add_argument('--max-statements', type=int, default=2000,
+                        help="cap rows per run at batch size x this, so batch size 1 doesn't take forever")
+    parser.add_argument('--results', default='benchmark_results.jsonl', help="JSON-lines results file")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("DAY 5: MYSQL BULK INSERT BENCHMARK")
+    print("=" * 70)
+
+    orders = synthetic_orders(args.rows)
+    connection = connect_with_backoff(db_settings())
+    cursor = connection.cursor()
+    cursor.execute(create_bench_table)
+    connection.commit()
+    print(f"\n✓ Connected to MySQL {connection.server_info}, scratch table {BENCH_TABLE}")
+    run_info = {'benchmark': 'mysql_insert', 'python': sys.version.split()[0], 'server': connection.server_info,
+                'timestamp': datetime.now().isoformat(timespec='seconds')}
+
+    print(f"\n{'method':>12} {'batch size':>11} {'rows':>9} {'batches':>8} {'seconds':>9} {'rows/sec':>11} {'speedup':>8}")
+    print("-" * 75)
+    try:
+        for method in args.methods:
+            baseline = None
+            for batch_size in args.batch_sizes:
+                cursor.execute(f"TRUNCATE TABLE {BENCH_TABLE}")
+                rows = min(args.rows, batch_size * args.max_statements)
+                result = bulk_insert(connection, BENCH_TABLE, ORDER_COLUMNS, orders[:rows],
+                                     batch_size=batch_size, method=method)
+                baseline = baseline or result['rows_per_sec']
+                speedup = result['rows_per_sec'] / baseline if baseline else 0
+                print(f"{method:>12} {batch_size:>11,} {result['rows']:>9,} {result['batches']:>8,} "
+                      f"{result['seconds']:>9.2f} {result['rows_per_sec']:>11,} {speedup:>7.1f}x")
+                with open(args.results, 'a') as file:
+                    file.write(json.dumps(dict(run_info, method=method, batch_size=batch_size, **result)) + "\n")
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+        cursor.close()
+        connection.close()
+
+    print(f"\n✓ Results appended to {args.results} (scratch table dropped)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+# DAY 5: Bulk Inserts - Many Rows per Round-Trip
+# mysql_basics.py used to insert with one cursor.execute() per row: every
+# order costs a network round-trip, a statement parse on the server and
+# (with a commit per row) a flush of the InnoDB log. bulk_insert() packs
+# `batch_size` rows into ONE statement
+#
+#   INSERT INTO windshield_orders (customer_name, city, ...)
+#   VALUES (%s, %s, ...), (%s, %s, ...), ...
+#
+# and commits once per batch.
+# (Like Laravel's Order::insert([...]) in chunks instead of Order::create() in a loop)
+#
+# Works with any DB-API connection that uses %s placeholders
+# (mysql.connector, PyMySQL, MySQLdb).
+
+import re
+import time
+from itertools import chain
+
+BATCH_SIZE = 1000
+# One statement must fit in the server's max_allowed_packet
+# (4 MB on MySQL 5.7, 64 MB on 8.0) - batches are cut early above this size
+MAX_STATEMENT_BYTES = 4 * 1024 * 1024
+METHODS = ('values', 'executemany')
+
+
+# ==========================================
+# 1. BUILDING THE STATEMENT
+# ==========================================
+
+def quote_name(name):
+    """`name` for a table/column - names can't be %s parameters, so only allow plain ones"""
+    if not re.fullmatch(r'\w+', name):
+        raise ValueError(f"invalid table/column name: {name!r}")
+    return f"`{name}`"
+
+
+def insert_sql(table, columns, rows=1):
+    """INSERT INTO `table` (`a`, `b`) VALUES (%s, %s), ... with `rows` groups"""
+    group = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    return (f"INSERT INTO {quote_name(table)} ({', '.join(quote_name(column) for column in columns)}) "
+            f"VALUES {', '.join([group] * rows)}")
+
+
+def row_bytes(row):
+    """Rough size of one row inside the statement (values + quotes + commas)"""
+    return sum(len(str(value)) + 4 for value in row) + 4
+
+
+def iter_batches(rows, batch_size=BATCH_SIZE, max_bytes=MAX_STATEMENT_BYTES):
+    """Lists of at most batch_size rows - fewer when the statement would get too big"""
+    batch = []
+    size = 0
+    for row in rows:
+        length = row_bytes(row)
+        if batch and (len(batch) >= batch_size or size + length > max_bytes):
+            yield batch
+            batch = []
+            size = 0
+        batch.append(row)
+        size += length
+    if batch:
+        yield batch
+
+
+# ==========================================
+# 2. INSERTING
+# ==========================================
+
+def bulk_insert(connection, table, columns, rows, batch_size=BATCH_SIZE,
+                max_bytes=MAX_STATEMENT_BYTES, method='values', progress=None):
+    """
+    Insert rows (tuples in `columns` order, any iterable) in batches,
+    committing after every batch
+    method: 'values'      - one multi-row INSERT ... VALUES statement per batch
+            'executemany' - cursor.executemany() per batch (mysql.connector
+                            rewrites it into the same multi-row statement)
+    progress: optional dict, kept up to date with 'rows' and 'batches' already
+              committed - if a batch fails it is rolled back and the error is
+              raised, the earlier batches stay in the table
+    Returns {'rows', 'batches', 'seconds', 'rows_per_sec'}
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r} (use one of {METHODS})")
+    columns = list(columns)
+    progress = progress if progress is not None else {}
+    progress.update(rows=0, batches=0)
+    statements = {}   # rows in batch -> SQL (all batches but the last have the same size)
+
+    started = time.perf_counter()
+    cursor = connection.cursor()
+    try:
+        for batch in iter_batches(rows, batch_size, max_bytes):
+            try:
+                if method == 'values':
+                    sql = statements.get(len(batch))
+                    if sql is None:
+                        sql = statements[len(batch)] = insert_sql(table, columns, len(batch))
+                    cursor.execute(sql, list(chain.from_iterable(batch)))
+                else:
+                    cursor.executemany(insert_sql(table, columns), batch)
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            progress['rows'] += len(batch)
+            progress['batches'] += 1
+    finally:
+        cursor.close()
+
+    seconds = time.perf_counter() - started
+    return {'rows': progress['rows'], 'batches': progress['batches'], 'seconds': seconds,
+            'rows_per_sec': round(progress['rows'] / seconds) if seconds > 0 else None}
@@ -0,0 +1,258 @@
+# DAY 5: Connection Pool - Reuse MySQL Connections Between Queries
+# Opening a MySQL connection costs a TCP handshake, authentication and
+# session setup - often more than the query itself. Jobs that run hundreds
+# of short queries should borrow an already open connection and give it
+# back, instead of connecting every time:
+#
+#   pool = create_pool()                 # settings from .env
+#   with pooled_connection(pool) as connection:
+#       cursor = connection.cursor(dictionary=True)
+#       ...
+#   print(pool_stats(pool))              # borrows, wait times, reconnects
+#
+#   - at most `size` connections are open; when all are busy, borrowers wait
+#     (up to `timeout` seconds) and the wait time is measured
+#   - a connection that sat idle is pinged before it is handed out; a dead
+#     one is replaced
+#   - connecting is retried with exponential backoff when the server is
+#     down or full, not when the password is wrong
+# (Like Laravel keeping one DB connection per worker with DB::reconnect() on "gone away")
+
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+import mysql.connector
+from mysql.connector import Error
+from dotenv import load_dotenv
+
+POOL_SIZE = 5
+BORROW_TIMEOUT = 30.0
+# A connection used less than this long ago is handed out without a ping
+PING_AFTER_IDLE = 0.5
+CONNECT_ATTEMPTS = 5
+BACKOFF_START = 0.2
+BACKOFF_MAX = 5.0
+# Worth retrying: too many connections, can't connect, server gone away, lost connection
+RETRY_ERRNOS = {1040, 2003, 2006, 2013}
+
+
+# ==========================================
+# 1. SETTINGS + CONNECTING
+# ==========================================
+
+def db_settings():
+    """Connection settings from the .env file (same names as Laravel's)"""
+    load_dotenv()
+    return {
+        'host': os.getenv('DB_HOST', '127.0.0.1'),
+        'port': int(os.getenv('DB_PORT', '3306')),
+        'user': os.getenv('DB_USERNAME', 'root'),
+        'password': os.getenv('DB_PASSWORD', ''),
+        'database': os.getenv('DB_DATABASE', 'my_ai_learning'),
+    }
+
+
+def connect_with_backoff(settings, attempts=CONNECT_ATTEMPTS, on_retry=None):
+    """
+    mysql.connector.connect(), retried after 0.2s, 0.4s, 0.8s ... (+ jitter)
+    while the server is unreachable or full - other errors are raised at once
+    on_retry: called before every retry (the pool counts them)
+    """
+    delay = BACKOFF_START
+    for attempt in range(1, attempts + 1):
+        try:
+            return mysql.connector.connect(**settings)
+        except Error as err:
+            if err.errno not in RETRY_ERRNOS or attempt == attempts:
+                raise
+            if on_retry is not None:
+                on_retry()
+            # Jitter: many jobs restarting together don't all retry at the same moment
+            time.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, BACKOFF_MAX)
+
+
+# ==========================================
+# 2. THE POOL
+# ==========================================
+
+def create_pool(settings=None, size=POOL_SIZE, timeout=BORROW_TIMEOUT):
+    """An empty pool - connections are opened the first time they are needed"""
+    return {
+        'settings': settings or db_settings(),
+        'size': size,
+        'timeout': timeout,
+        'idle': [],            # (connection, time it was given back), most recent last
+        'open': 0,             # connections that exist (idle + borrowed)
+        'closed': False,
+        'condition': threading.Condition(),
+        'stats': {
+            'borrows': 0, 'waits': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0,
+            'timeouts': 0, 'connections_opened': 0, 'connect_retries': 0,
+            'failed_pings': 0, 'discarded': 0,
+        },
+    }
+
+
+def borrow(pool, timeout=None):
+    """
+    A working connection from the pool - give it back with release()
+    Waits while all `size` connections are busy; TimeoutError after `timeout`
+    """
+    timeout = pool['timeout'] if timeout is None else timeout
+    stats = pool['stats']
+    condition = pool['condition']
+    started = time.perf_counter()
+
+    with condition:
+        waited = False
+        while not pool['idle'] and pool['open'] >= pool['size']:
+            if pool['closed']:
+                raise RuntimeError("the connection pool is closed")
+            remaining = timeout - (time.perf_counter() - started)
+            if remaining <= 0:
+                stats['timeouts'] += 1
+                raise TimeoutError(f"no free database connection after {timeout}s "
+                                   f"({pool['size']} in use)")
+            waited = True
+            condition.wait(remaining)
+        if pool['closed']:
+            raise RuntimeError("the connection pool is closed")
+
+        wait = time.perf_counter() - started
+        stats['borrows'] += 1
+        stats['wait_seconds'] += wait
+        stats['max_wait_seconds'] = max(stats['max_wait_seconds'], wait)
+        if waited:
+            stats['waits'] += 1
+
+        if pool['idle']:
+            connection, returned_at = pool['idle'].pop()
+        else:
+            connection, returned_at = None, None
+            pool['open'] += 1   # reserve the slot, connect outside the lock
+
+    # Check / connect without holding the lock - other threads keep going
+    # (the counters are still only changed under it, see count_stat)
+    try:
+        if connection is not None and time.monotonic() - returned_at > PING_AFTER_IDLE:
+            try:
+                connection.ping(reconnect=False)
+            except Error:
+                # Server restarted, wait_timeout expired, ... - replace it
+                count_stat(pool, 'failed_pings')
+                close_quietly(connection)
+                connection = None
+        if connection is None:
+            connection = connect_with_backoff(pool['settings'],
+                                              on_retry=lambda: count_stat(pool, 'connect_retries'))
+            count_stat(pool, 'connections_opened')
+    except BaseException:
+        with condition:
+            pool['open'] -= 1
+            condition.notify()
+        raise
+    return connection
+
+
+def count_stat(pool, name):
+    """stats[name] += 1 under the pool lock - += on a dict item is not atomic"""
+    with pool['condition']:
+        pool['stats'][name] += 1
+
+
+def release(pool, connection, broken=False):
+    """
+    Give a borrowed connection back
+    broken=True (or a failing rollback) closes it instead of keeping it
+    """
+    if not broken:
+        try:
+            connection.rollback()   # never hand out a half-finished transaction
+        except Error:
+            broken = True
+    with pool['condition']:
+        if broken or pool['closed']:
+            close_quietly(connection)
+            pool['open'] -= 1
+            if broken:
+                pool['stats']['discarded'] += 1
+        else:
+            pool['idle'].append((connection, time.monotonic()))
+        pool['condition'].notify()
+
+
+@contextmanager
+def pooled_connection(pool, timeout=None):
+    """with pooled_connection(pool) as connection: ... - always given back"""
+    connection = borrow(pool, timeout)
+    try:
+        yield connection
+    except Error as err:
+        # A lost connection must not go back into the pool
+        release(pool, connection, broken=err.errno in RETRY_ERRNOS or not connection.is_connected())
+        raise
+    except BaseException:
+        release(pool, connection)
+        raise
+    release(pool, connection)
+
+
+def close_quietly(connection):
+    try:
+        connection.close()
+    except Error:
+        pass
+
+
+def close_pool(pool):
+    """Close the idle connections; borrowed ones are closed when released"""
+    with pool['condition']:
+        pool['closed'] = True
+        for connection, _ in pool['idle']:
+            close_quietly(connection)
+            pool['open'] -= 1
+        pool['idle'] = []
+        pool['condition'].notify_all()
+
+
+# ==========================================
+# 3. METRICS
+# ==========================================
+
+def pool_stats(pool):
+    """Counters + wait-time metrics, e.g. for a job's log line"""
+    with pool['condition']:
+        stats = dict(pool['stats'])
+        stats.update(size=pool['size'], open=pool['open'], idle=len(pool['idle']),
+                     in_use=pool['open'] - len(pool['idle']))
+    stats['avg_wait_ms'] = stats['wait_seconds'] / stats['borrows'] * 1000 if stats['borrows'] else 0.0
+    return stats
+
+
+def pool_report_lines(pool):
+    stats = pool_stats(pool)
+    return [
+        f"Pool: {stats['in_use']} in use, {stats['idle']} idle, {stats['size']} max",
+        f"Borrows: {stats['borrows']} ({stats['waits']} had to wait, {stats['timeouts']} timed out)",
+        f"Wait: avg {stats['avg_wait_ms']:.2f} ms, max {stats['max_wait_seconds'] * 1000:.2f} ms",
+        f"Connections opened: {stats['connections_opened']} "
+        f"({stats['connect_retries']} retries, {stats['failed_pings']} failed pings, {stats['discarded']} discarded)",
+    ]
+
+
+# One shared pool per process, created on first use
+_shared_pool = None
+_shared_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide pool built from .env (like Laravel's DB facade)"""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None or _shared_pool['closed']:
+            _shared_pool = create_pool()
+        return _shared_pool
@@ -7,21 +7,21 @@ print("DAY 5: MYSQL DATABASE - TABLE CREATION & DATA MANAGEMENT")
 print("=" * 80)
 
 # Import required libraries
-import mysql.connector
 from mysql.connector import Error
-import os
-from dotenv import load_dotenv
 from datetime import datetime
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Get database credentials from .env file
-DB_HOST = os.getenv('DB_HOST', '127.0.0.1')
-DB_PORT = int(os.getenv('DB_PORT', '3306'))
-DB_USER = os.getenv('DB_USERNAME', 'root')
-DB_PASSWORD = os.getenv('DB_PASSWORD', '')
-DB_NAME = os.getenv('DB_DATABASE', 'my_ai_learning')
+from bulk_insert import bulk_insert
+from db_pool import db_settings, create_pool, borrow, release, close_pool, pool_report_lines
+from stream_query import stream_rows
+from sql_grouping import group_totals
+from order_summary import create_summary_tables, refresh_summary, summary_totals
+
+# Get database credentials from .env file (see db_pool.py)
+settings = db_settings()
+DB_HOST = settings['host']
+DB_PORT = settings['port']
+DB_USER = settings['user']
+DB_PASSWORD = settings['password']
+DB_NAME = settings['database']
 
 print("\n" + "=" * 80)
 print("1. DATABASE CREDENTIALS (From .env file)")
@@ -45,15 +45,13 @@ print("=" * 80)
 connection = None
 cursor = None
 
+# A pool keeps connections open between jobs (see db_pool.py). Borrowing
+# retries with backoff while the server is starting up or full
+pool = create_pool(settings, size=2)
+
 try:
-    # Create connection
-    connection = mysql.connector.connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        database=DB_NAME
-    )
+    # Borrow a connection (opened on first use)
+    connection = borrow(pool)
 
     if connection.is_connected():
         db_info = connection.server_info  # Fixed deprecation warning
@@ -156,7 +154,8 @@ CREATE TABLE IF NOT EXISTS windshield_orders (
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     INDEX idx_status (status),
     INDEX idx_city (city),
-    INDEX idx_customer (customer_name)
+    INDEX idx_customer (customer_name),
+    INDEX idx_updated_at (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 """
 
@@ -171,6 +170,12 @@ try:
     connection.commit()
     print("   ✅ 'windshield_orders' table ready!")
 
+    # Dashboard summary tables (see order_summary.py). An older
+    # windshield_orders without idx_updated_at: run order_summary.py --setup once
+    print("\n📝 Creating the order summary tables...")
+    create_summary_tables(connection)
+    print("   ✅ summary tables ready!")
+
 except Error as e:
     print(f"   ❌ Error creating tables: {e}")
     connection.rollback()
@@ -201,35 +206,30 @@ sample_orders = [
     ("Muhammad Karim", "muhammad@email.com", "0300-5234567", "windshield_replacement", "Rawalpindi", 3500, "pending", "Ahmed"),
 ]
 
+# bulk_insert() sends many rows in ONE statement (see bulk_insert.py):
+#   INSERT INTO reviews (...) VALUES (%s, %s, %s, %s), (%s, %s, %s, %s), ...
+# instead of one cursor.execute() - one round-trip - per row.
+# It commits after every batch (batch_size rows, 1000 by default)
+
 # Insert reviews
 print("\n📝 Inserting reviews...")
-insert_review = "INSERT INTO reviews (customer_name, review_text, rating, review_source) VALUES (%s, %s, %s, %s)"
+review_columns = ('customer_name', 'review_text', 'rating', 'review_source')
 
 try:
-    for review in sample_reviews:
-        cursor.execute(insert_review, review)
-    connection.commit()
-    print(f"   ✅ Inserted {len(sample_reviews)} reviews")
+    result = bulk_insert(connection, 'reviews', review_columns, sample_reviews)
+    print(f"   ✅ Inserted {result['rows']} reviews in {result['batches']} statement(s)")
 except Error as e:
     print(f"   ⚠️  {e}")
-    connection.rollback()
 
 # Insert orders
 print("\n📝 Inserting windshield orders...")
-insert_order = """
-    INSERT INTO windshield_orders
-    (customer_name, email, phone, service_type, city, amount, status, technician_name)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-"""
+order_columns = ('customer_name', 'email', 'phone', 'service_type', 'city', 'amount', 'status', 'technician_name')
 
 try:
-    for order in sample_orders:
-        cursor.execute(insert_order, order)
-    connection.commit()
-    print(f"   ✅ Inserted {len(sample_orders)} orders")
+    result = bulk_insert(connection, 'windshield_orders', order_columns, sample_orders)
+    print(f"   ✅ Inserted {result['rows']} orders in {result['batches']} statement(s)")
 except Error as e:
     print(f"   ⚠️  {e}")
-    connection.rollback()
 
 # ==========================================
 # 6. QUERY AND DISPLAY DATA
@@ -255,16 +255,19 @@ except Error as e:
     print(f"  Error: {e}")
 
 # Get all orders
+# fetchall() would load the whole table into memory first. stream_rows()
+# (see stream_query.py) reads it in chunks of 1000 rows - memory stays the
+# same for 10 orders or 100 million
 print("\n📊 All Windshield Orders:")
 print("-" * 80)
 try:
-    cursor.execute("SELECT id, customer_name, service_type, city, amount, status FROM windshield_orders")
-    orders = cursor.fetchall()
-
-    if orders:
-        for order in orders:
-            print(f"  #{order['id']}: {order['customer_name']} - {order['service_type']} in {order['city']} - Rs.{order['amount']} ({order['status']})")
-    else:
+    order_count = 0
+    for chunk in stream_rows(connection, "SELECT id, customer_name, service_type, city, amount, status "
+                                         "FROM windshield_orders", chunk_size=1000):
+        for order_id, customer_name, service_type, city, amount, status in chunk:
+            print(f"  #{order_id}: {customer_name} - {service_type} in {city} - Rs.{amount} ({status})")
+        order_count += len(chunk)
+    if not order_count:
         print("  No orders found")
 except Error as e:
     print(f"  Error: {e}")
@@ -273,11 +276,27 @@ except Error as e:
 print("\n📊 Order Statistics:")
 print("-" * 80)
 try:
-    cursor.execute("SELECT COUNT(*) as total, SUM(amount) as revenue, AVG(amount) as avg_amount FROM windshield_orders")
-    stats = cursor.fetchone()
-    print(f"  Total Orders: {stats['total']}")
+    # COUNT/SUM/AVG over windshield_orders would scan every order each time.
+    # The summary table (day x city x status, see order_summary.py) is
+    # refreshed with only the orders changed since the last refresh
+    # (the tables were created in step 4)
+    refresh = refresh_summary(connection)
+    print(f"  (summary refreshed: {refresh['changed']} changed order(s) applied "
+          f"in {refresh['seconds'] * 1000:.1f} ms)")
+    stats = summary_totals(connection)
+    print(f"  Total Orders: {stats['orders']}")
     print(f"  Total Revenue: Rs.{stats['revenue']}")
-    print(f"  Average Order Value: Rs.{stats['avg_amount']:.0f}")
+    print(f"  Average Order Value: Rs.{stats['average']:.0f}")
+except (Error, TimeoutError) as e:   # TimeoutError: another refresh is running
+    print(f"  Error: {e}")
+
+# Breakdown per city - the GROUP BY runs in MySQL (see sql_grouping.py),
+# only one row per city comes back (Day 10 does the same with pandas)
+print("\n📊 Orders per City (GROUP BY in MySQL):")
+print("-" * 80)
+try:
+    for city, totals in group_totals(connection, 'city', ['count', 'sum', 'mean']).items():
+        print(f"  {city}: {totals['count']} orders, Rs.{totals['sum']} total, Rs.{totals['mean']:.0f} average")
 except Error as e:
     print(f"  Error: {e}")
 
@@ -301,9 +320,9 @@ Create table                      | Schema::create('table', ...)    | cursor.exe
 Insert single record              | Order::create(['col' => val])  | cursor.execute("INSERT INTO...")
                                   |                                 | connection.commit()
 
-Insert multiple records           | Order::insert([...])           | for row in data:
-                                  |                                 |     cursor.execute("INSERT...", row)
-                                  |                                 | connection.commit()
+Insert multiple records           | Order::insert([...])           | bulk_insert(connection, 'table',
+                                  |                                 |             columns, rows)
+                                  |                                 | (one INSERT per 1000 rows)
 
 Get all records                   | Order::all()                   | cursor.execute("SELECT * FROM table")
                                   |                                 | results = cursor.fetchall()
@@ -358,9 +377,13 @@ if cursor:
     cursor.close()
     print("\n✓ Cursor closed")
 
-if connection and connection.is_connected():
-    connection.close()
-    print("✓ Database connection closed")
+if connection:
+    release(pool, connection)
+    print("✓ Connection returned to the pool")
+for line in pool_report_lines(pool):
+    print(f"   {line}")
+close_pool(pool)
+print("✓ Pool closed")
 
 
 # ==========================================
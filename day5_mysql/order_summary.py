@@ -0,0 +1,340 @@
+# DAY 5: Summary Tables - Dashboard Numbers Without Scanning Every Order
+# "SELECT COUNT(*), SUM(amount), AVG(amount) FROM windshield_orders" reads
+# the whole table on every dashboard refresh. Instead we keep a small
+# pre-aggregated table
+#
+#   order_daily_summary: day x city x status -> orders, revenue
+#
+# and refresh it INCREMENTALLY: only orders whose updated_at is newer than
+# the last refresh (the high-water mark) are looked at. An order that
+# changed status moves from one bucket to another - order_summary_state
+# remembers what each order added last time, so the old contribution is
+# subtracted before the new one is added. Re-applying an order is harmless,
+# which is why every refresh re-reads a small overlap window (rows written
+# in the same second, or by a transaction that committed late).
+# (Like a Laravel scheduled job keeping a `daily_stats` table up to date
+# instead of running Order::sum('amount') on every page load)
+#
+# Deleted orders have no updated_at to notice - run rebuild_summary()
+# (e.g. nightly) if orders are ever deleted.
+#
+# Two refreshes never run at the same time (cron overlap, two servers): each
+# holds the MySQL named lock 'order_summary_refresh' from reading the
+# high-water mark to the commit, so the same orders are never applied twice.
+#
+#   python day5_mysql/order_summary.py --setup     # once: tables + updated_at index
+#   python day5_mysql/order_summary.py             # every few minutes (cron)
+#   python day5_mysql/order_summary.py --rebuild   # nightly, if orders are deleted
+
+import argparse
+import time
+from datetime import timedelta
+
+from db_pool import db_settings, connect_with_backoff
+from sql_grouping import where_clause, group_columns
+
+SUMMARY_TABLE = 'order_daily_summary'
+STATE_TABLE = 'order_summary_state'
+REFRESH_TABLE = 'summary_refresh_state'
+# Seconds before the high-water mark that are read again on every refresh
+OVERLAP_SECONDS = 60
+REFRESH_LOCK = 'order_summary_refresh'
+# How long a refresh waits for one that is already running
+LOCK_TIMEOUT_SECONDS = 60
+
+create_summary_table = f"""
+CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+    day DATE NOT NULL,
+    city VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    orders INT NOT NULL,
+    revenue BIGINT NOT NULL,
+    PRIMARY KEY (day, city, status),
+    INDEX idx_summary_city (city),
+    INDEX idx_summary_status (status)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+"""
+
+# What each order currently adds to the summary
+create_state_table = f"""
+CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+    order_id INT PRIMARY KEY,
+    day DATE NOT NULL,
+    city VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    amount INT NOT NULL
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+"""
+
+create_refresh_table = f"""
+CREATE TABLE IF NOT EXISTS {REFRESH_TABLE} (
+    name VARCHAR(64) PRIMARY KEY,
+    high_water_mark TIMESTAMP NULL,
+    refreshed_at TIMESTAMP NULL,
+    rows_applied INT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+"""
+
+# Adds the counts to an existing bucket instead of failing on the primary key
+UPSERT = "ON DUPLICATE KEY UPDATE orders = orders + VALUES(orders), revenue = revenue + VALUES(revenue)"
+
+
+# ==========================================
+# 1. SETUP
+# ==========================================
+
+def create_summary_tables(connection):
+    """Create the summary tables (CREATE TABLE IF NOT EXISTS - cheap to repeat)"""
+    cursor = connection.cursor()
+    try:
+        for ddl in (create_summary_table, create_state_table, create_refresh_table):
+            cursor.execute(ddl)
+        connection.commit()
+    finally:
+        cursor.close()
+
+
+def add_updated_at_index(connection):
+    """
+    One-off migration for a windshield_orders table created before it had
+    idx_updated_at - without it every refresh scans the whole table
+    ALTER TABLE rebuilds the table, so this belongs in --setup, not in a refresh
+    Returns True if the index was added
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SHOW INDEX FROM windshield_orders WHERE Column_name = 'updated_at'")
+        if cursor.fetchall():
+            return False
+        cursor.execute("ALTER TABLE windshield_orders ADD INDEX idx_updated_at (updated_at)")
+        return True
+    finally:
+        cursor.close()
+
+
+def high_water_mark(connection):
+    """updated_at of the newest order already in the summary (None = never refreshed)"""
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT high_water_mark FROM {REFRESH_TABLE} WHERE name = %s", (SUMMARY_TABLE,))
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    return row[0] if row else None
+
+
+# ==========================================
+# 2. INCREMENTAL REFRESH
+# ==========================================
+
+def lock_refresh(connection, timeout=LOCK_TIMEOUT_SECONDS):
+    """
+    Take the refresh lock (waits up to `timeout` seconds for a running refresh)
+    A named lock belongs to the session: the same connection can take it
+    again (rebuild_summary -> refresh_summary), and it is freed if the
+    connection dies
+    """
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT GET_LOCK(%s, %s)", (REFRESH_LOCK, timeout))
+        (locked,) = cursor.fetchone()
+    finally:
+        cursor.close()
+    if locked != 1:
+        raise TimeoutError(f"another summary refresh still holds '{REFRESH_LOCK}' after {timeout}s")
+
+
+def unlock_refresh(connection):
+    cursor = connection.cursor()
+    try:
+        cursor.execute("SELECT RELEASE_LOCK(%s)", (REFRESH_LOCK,))
+        cursor.fetchone()
+    finally:
+        cursor.close()
+
+
+def refresh_summary(connection, lock_timeout=LOCK_TIMEOUT_SECONDS):
+    """
+    Apply every order changed since the last refresh to the summary
+    (one transaction - the dashboard never sees half a refresh)
+    Returns {'changed', 'high_water_mark', 'seconds'}
+    """
+    started = time.perf_counter()
+    lock_refresh(connection, lock_timeout)
+    try:
+        changed, newest, since = apply_changes(connection)
+    finally:
+        unlock_refresh(connection)
+
+    return {'changed': changed, 'high_water_mark': newest or since,
+            'seconds': time.perf_counter() - started}
+
+
+def apply_changes(connection):
+    """
+    The refresh itself - call it with the refresh lock held, so the
+    high-water mark can't move between reading it and the commit
+    Returns (changed orders, newest updated_at, previous high-water mark)
+    """
+    since = high_water_mark(connection)
+    cursor = connection.cursor()
+    try:
+        # 1. The changed orders (uses idx_updated_at). status can be NULL in
+        #    windshield_orders, the summary key can't
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS changed_orders")
+        sql = ("CREATE TEMPORARY TABLE changed_orders (PRIMARY KEY (id)) "
+               "SELECT id, DATE(created_at) AS day, city, COALESCE(status, 'unknown') AS status, "
+               "amount, updated_at FROM windshield_orders")
+        params = ()
+        if since is not None:
+            sql += " WHERE updated_at >= %s"
+            params = (since - timedelta(seconds=OVERLAP_SECONDS),)
+        cursor.execute(sql, params)
+        cursor.execute("SELECT COUNT(*), MAX(updated_at) FROM changed_orders")
+        changed, newest = cursor.fetchone()
+
+        if changed:
+            # 2. Take back what these orders added last time...
+            cursor.execute(
+                f"INSERT INTO {SUMMARY_TABLE} (day, city, status, orders, revenue) "
+                f"SELECT s.day, s.city, s.status, -COUNT(*), -SUM(s.amount) "
+                f"FROM {STATE_TABLE} s JOIN changed_orders c ON c.id = s.order_id "
+                f"GROUP BY s.day, s.city, s.status {UPSERT}")
+            # 3. ...add what they add now...
+            cursor.execute(
+                f"INSERT INTO {SUMMARY_TABLE} (day, city, status, orders, revenue) "
+                f"SELECT day, city, status, COUNT(*), SUM(amount) FROM changed_orders "
+                f"GROUP BY day, city, status {UPSERT}")
+            # 4. ...and remember it for next time
+            cursor.execute(
+                f"REPLACE INTO {STATE_TABLE} (order_id, day, city, status, amount) "
+                f"SELECT id, day, city, status, amount FROM changed_orders")
+            cursor.execute(f"DELETE FROM {SUMMARY_TABLE} WHERE orders = 0")
+
+        cursor.execute(
+            f"INSERT INTO {REFRESH_TABLE} (name, high_water_mark, refreshed_at, rows_applied) "
+            f"VALUES (%s, %s, NOW(), %s) ON DUPLICATE KEY UPDATE "
+            f"high_water_mark = COALESCE(VALUES(high_water_mark), high_water_mark), "
+            f"refreshed_at = VALUES(refreshed_at), rows_applied = VALUES(rows_applied)",
+            (SUMMARY_TABLE, newest, changed))
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        try:
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS changed_orders")
+        except Exception:
+            pass   # it belongs to this session anyway - don't hide the real error
+        cursor.close()
+    return changed, newest, since
+
+
+def rebuild_summary(connection):
+    """
+    Start over from the full table (after deletes, or to double-check)
+    The emptying is committed together with the refresh - no empty dashboard
+    """
+    lock_refresh(connection)
+    try:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"DELETE FROM {SUMMARY_TABLE}")
+            cursor.execute(f"DELETE FROM {STATE_TABLE}")
+            cursor.execute(f"DELETE FROM {REFRESH_TABLE} WHERE name = %s", (SUMMARY_TABLE,))
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        return refresh_summary(connection)
+    finally:
+        unlock_refresh(connection)
+
+
+# ==========================================
+# 3. READING THE DASHBOARD NUMBERS
+# ==========================================
+
+def summary_where(first_day=None, last_day=None, where=None):
+    """WHERE clause on the summary table: day range + city/status filters"""
+    where_sql, params = where_clause(where)
+    conditions = [where_sql[len(" WHERE "):]] if where_sql else []
+    if first_day:
+        conditions.append("day >= %s")
+        params.append(first_day)
+    if last_day:
+        conditions.append("day <= %s")
+        params.append(last_day)
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+def summary_totals(connection, first_day=None, last_day=None, where=None):
+    """
+    Orders, revenue and average order value from the summary table
+    where: {'city': 'Lahore', 'status': ['completed', 'pending']}
+    """
+    where_sql, params = summary_where(first_day, last_day, where)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT COALESCE(SUM(orders), 0), COALESCE(SUM(revenue), 0) FROM {SUMMARY_TABLE}{where_sql}",
+                       params)
+        orders, revenue = cursor.fetchone()
+    finally:
+        cursor.close()
+    orders, revenue = int(orders), int(revenue)
+    return {'orders': orders, 'revenue': revenue, 'average': revenue / orders if orders else 0.0}
+
+
+def summary_by(connection, by, first_day=None, last_day=None, where=None):
+    """{group: {'orders', 'revenue', 'average'}} by 'day', 'city' and/or 'status'"""
+    by = [by] if isinstance(by, str) else list(by)
+    columns = ['day' if name == 'day' else group_columns([name])[0] for name in by]
+    for name in columns:
+        if name not in ('day', 'city', 'status'):
+            raise ValueError(f"the summary has no '{name}' - use day, city or status")
+    group = ', '.join(columns)
+    where_sql, params = summary_where(first_day, last_day, where)
+    cursor = connection.cursor()
+    try:
+        cursor.execute(f"SELECT {group}, SUM(orders), SUM(revenue) FROM {SUMMARY_TABLE}{where_sql} "
+                       f"GROUP BY {group} ORDER BY {group}", params)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    results = {}
+    for row in rows:
+        key = row[0] if len(by) == 1 else tuple(row[:len(by)])
+        orders, revenue = int(row[-2]), int(row[-1])
+        results[key] = {'orders': orders, 'revenue': revenue, 'average': revenue / orders if orders else 0.0}
+    return results
+
+
+# ==========================================
+# 4. COMMAND LINE (SETUP / SCHEDULED REFRESH)
+# ==========================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Set up or refresh the order summary tables")
+    parser.add_argument('--setup', action='store_true',
+                        help="create the summary tables and the windshield_orders.updated_at index (run once)")
+    parser.add_argument('--rebuild', action='store_true', help="rebuild the summary from every order")
+    args = parser.parse_args()
+
+    connection = connect_with_backoff(db_settings())
+    try:
+        if args.setup:
+            create_summary_tables(connection)
+            if add_updated_at_index(connection):
+                print("✓ Added idx_updated_at to windshield_orders")
+            print("✓ Summary tables ready")
+            return
+        refresh = rebuild_summary(connection) if args.rebuild else refresh_summary(connection)
+        print(f"✓ {refresh['changed']} changed order(s) applied in {refresh['seconds'] * 1000:.1f} ms "
+              f"(high-water mark: {refresh['high_water_mark']})")
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+# DAY 5: Group By in MySQL, Not in Python
+# Day 10 pulls every order into pandas and then runs
+#   df.groupby('city')['amount'].agg(['count', 'sum', 'mean', 'min', 'max'])
+# With the orders in MySQL that means sending millions of rows over the
+# wire to end up with 6 result rows. group_totals() takes the same grouping
+# and lets the database do it:
+#
+#   group_totals(connection, 'city', ['count', 'sum', 'mean', 'min', 'max'])
+#   -> SELECT city, COUNT(amount), SUM(amount), AVG(amount), MIN(amount), MAX(amount)
+#      FROM windshield_orders GROUP BY city ORDER BY city
+#
+#   group_totals(connection, ['technician', 'status'], ['size'], where={'status': ['completed', 'pending']})
+#
+# Only the small result crosses the network. Filters on status / city
+# become WHERE clauses that can use the idx_status / idx_city indexes
+# (explain_grouping() shows which index MySQL picked).
+# Aggregations SQL can't do (median, your own function) are computed in
+# Python from a stream of ONLY the needed columns.
+# (Like Laravel's Order::selectRaw('city, sum(amount)')->groupBy('city')->get())
+
+import statistics
+from decimal import Decimal
+
+from bulk_insert import quote_name
+from stream_query import stream_rows
+
+ORDERS_TABLE = 'windshield_orders'
+GROUP_COLUMNS = ('city', 'status', 'service_type', 'technician_name')
+# Day 10's CSV calls the column 'technician'
+COLUMN_ALIASES = {'technician': 'technician_name'}
+
+# pandas name -> SQL (with {column} for the value column)
+SQL_AGGREGATIONS = {
+    'size': 'COUNT(*)',
+    'count': 'COUNT({column})',
+    'sum': 'SUM({column})',
+    'mean': 'AVG({column})',
+    'avg': 'AVG({column})',
+    'min': 'MIN({column})',
+    'max': 'MAX({column})',
+    'nunique': 'COUNT(DISTINCT {column})',
+    'std': 'STDDEV_SAMP({column})',   # sample std/var, like pandas (ddof=1)
+    'var': 'VAR_SAMP({column})',
+}
+# Aggregations done in Python, on the streamed values of one group
+PYTHON_AGGREGATIONS = {
+    'median': statistics.median,
+}
+
+
+# ==========================================
+# 1. BUILDING THE QUERY
+# ==========================================
+
+def normalize_aggregations(aggregations):
+    """['sum', 'mean'] or {'Total': 'sum', 'Range': lambda values: ...} -> [(name, agg)]"""
+    if isinstance(aggregations, str) or callable(aggregations):
+        aggregations = [aggregations]
+    if isinstance(aggregations, dict):
+        return list(aggregations.items())
+    return [(agg if isinstance(agg, str) else getattr(agg, '__name__', 'custom'), agg) for agg in aggregations]
+
+
+def where_clause(where):
+    """{'status': 'completed', 'city': ['Lahore', 'Karachi']} -> (SQL, params)"""
+    conditions = []
+    params = []
+    for column, value in (where or {}).items():
+        column = COLUMN_ALIASES.get(column, column)
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            conditions.append(f"{quote_name(column)} IN ({', '.join(['%s'] * len(values))})")
+            params.extend(values)
+        elif value is None:
+            conditions.append(f"{quote_name(column)} IS NULL")
+        else:
+            conditions.append(f"{quote_name(column)} = %s")
+            params.append(value)
+    return (" WHERE " + " AND ".join(conditions) if conditions else ""), params
+
+
+def group_columns(by):
+    """Table column names for `by` ('technician' -> 'technician_name')"""
+    columns = [COLUMN_ALIASES.get(name, name) for name in by]
+    for name in columns:
+        if name not in GROUP_COLUMNS:
+            raise ValueError(f"can't group by '{name}' (use one of {GROUP_COLUMNS})")
+    return columns
+
+
+def grouping_sql(by, aggregations, column='amount', where=None, table=ORDERS_TABLE):
+    """(SQL, params) of the GROUP BY query for the aggregations SQL can do"""
+    columns = group_columns(by)
+    selects = [quote_name(name) for name in columns]
+    selects += [SQL_AGGREGATIONS[agg].format(column=quote_name(column)) for _, agg in aggregations]
+    group = ', '.join(quote_name(name) for name in columns)
+    where_sql, params = where_clause(where)
+    return (f"SELECT {', '.join(selects)} FROM {quote_name(table)}{where_sql} "
+            f"GROUP BY {group} ORDER BY {group}"), params
+
+
+# ==========================================
+# 2. RUNNING IT
+# ==========================================
+
+def plain_value(agg, value):
+    """MySQL returns SUM/AVG as Decimal - give back int for sums, float for averages"""
+    if isinstance(value, Decimal):
+        return int(value) if agg in ('sum', 'min', 'max') and value == value.to_integral_value() else float(value)
+    if agg in ('std', 'var') and value is not None:
+        return float(value)
+    return value
+
+
+def group_totals(connection, by, aggregations=('count', 'sum', 'mean', 'min', 'max'),
+                 column='amount', where=None, table=ORDERS_TABLE):
+    """
+    Like df.groupby(by)[column].agg(aggregations), computed by MySQL
+    by: one column or a list ('city', 'status', 'service_type', 'technician')
+    Returns {group value (a tuple when grouping by several columns): {name: value}}
+    in group order
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    aggregations = normalize_aggregations(aggregations)
+    in_sql = [(name, agg) for name, agg in aggregations if isinstance(agg, str) and agg in SQL_AGGREGATIONS]
+    in_python = [(name, agg) for name, agg in aggregations if (name, agg) not in in_sql]
+    for name, agg in in_python:
+        if isinstance(agg, str) and agg not in PYTHON_AGGREGATIONS:
+            raise ValueError(f"unknown aggregation '{agg}'")
+
+    results = {}
+    if in_sql or not in_python:
+        sql, params = grouping_sql(by, in_sql, column, where, table)
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql, params)
+            for row in cursor.fetchall():   # one row per group - small
+                key = row[0] if len(by) == 1 else tuple(row[:len(by)])
+                results[key] = {name: plain_value(agg, value)
+                                for (name, agg), value in zip(in_sql, row[len(by):])}
+        finally:
+            cursor.close()
+
+    if in_python:
+        for key, values in grouped_values(connection, by, column, where, table).items():
+            totals = results.setdefault(key, {})
+            for name, agg in in_python:
+                function = PYTHON_AGGREGATIONS[agg] if isinstance(agg, str) else agg
+                totals[name] = function(values) if values else None
+        if not in_sql:
+            results = dict(sorted(results.items(), key=lambda item: group_sort_key(item[0])))
+
+    # Same column order as asked for
+    return {key: {name: totals.get(name) for name, _ in aggregations} for key, totals in results.items()}
+
+
+def group_sort_key(key):
+    """Sort groups like ORDER BY does: NULL first"""
+    return [(value is not None, value) for value in (key if isinstance(key, tuple) else (key,))]
+
+
+def grouped_values(connection, by, column='amount', where=None, table=ORDERS_TABLE):
+    """
+    Fallback for aggregations SQL can't do: stream ONLY the group columns +
+    the value column (same WHERE) and collect {group: [values]}
+    """
+    columns = group_columns(by)
+    where_sql, params = where_clause(where)
+    sql = (f"SELECT {', '.join(quote_name(name) for name in columns)}, {quote_name(column)} "
+           f"FROM {quote_name(table)}{where_sql}")
+    groups = {}
+    for chunk in stream_rows(connection, sql, params):
+        for row in chunk:
+            key = row[0] if len(by) == 1 else tuple(row[:-1])
+            value = row[-1]
+            values = groups.setdefault(key, [])
+            if value is not None:   # like SQL and pandas: NULLs are skipped
+                values.append(float(value) if isinstance(value, Decimal) else value)
+    return groups
+
+
+def explain_grouping(connection, by, aggregations=('count', 'sum'), column='amount', where=None,
+                     table=ORDERS_TABLE):
+    """The index MySQL uses for the GROUP BY query (None = full table scan)"""
+    aggregations = [(name, agg) for name, agg in normalize_aggregations(aggregations)
+                    if isinstance(agg, str) and agg in SQL_AGGREGATIONS]
+    sql, params = grouping_sql([by] if isinstance(by, str) else list(by), aggregations, column, where, table)
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("EXPLAIN " + sql, params)
+        plan = cursor.fetchall()
+    finally:
+        cursor.close()
+    return plan[0].get('key') if plan else None
@@ -0,0 +1,149 @@
+# DAY 5: Streaming Big SELECTs - Chunk by Chunk
+# cursor.fetchall() pulls EVERY row into Python before you see the first
+# one - on a 100M row table that's tens of GB of dicts. Here the result is
+# read with an unbuffered cursor (rows stay on the server/socket until we
+# ask for them) and fetchmany(chunk_size), so memory is bounded by ONE chunk:
+#
+#   for chunk in stream_rows(connection, "SELECT * FROM windshield_orders"):
+#       ...                                   # list of tuples
+#   for columns in stream_columns(connection, sql):
+#       columns['amount']                     # array('q') - 8 bytes per value
+#   for frame in stream_dataframes(connection, sql):
+#       frame.groupby('city')['amount'].sum() # typed pandas DataFrame
+#
+# (Like Laravel's Order::lazy() / ->cursor() instead of Order::all())
+#
+# While a stream is open the connection can't run other queries. Stopping
+# early reads the rest of the result and throws it away - put a LIMIT in
+# the query if you only need the first rows.
+
+from array import array
+
+from mysql.connector import FieldType, FieldFlag
+
+try:
+    import pandas as pd   # only needed for stream_dataframes()
+except ImportError:
+    pd = None
+
+CHUNK_ROWS = 10_000
+
+INT_TYPES = {FieldType.TINY, FieldType.SHORT, FieldType.INT24, FieldType.LONG, FieldType.LONGLONG, FieldType.YEAR}
+FLOAT_TYPES = {FieldType.FLOAT, FieldType.DOUBLE, FieldType.DECIMAL, FieldType.NEWDECIMAL}
+DATE_TYPES = {FieldType.DATE, FieldType.DATETIME, FieldType.TIMESTAMP}
+
+
+# ==========================================
+# 1. COLUMN TYPES FROM THE RESULT
+# ==========================================
+
+def column_kinds(description):
+    """
+    'int' / 'float' / 'date' / 'enum' / 'str' for every column of
+    cursor.description (decided once, not per value)
+    """
+    kinds = {}
+    for column in description:
+        name, type_code = column[0], column[1]
+        flags = column[7] if len(column) > 7 else 0
+        if type_code in INT_TYPES:
+            kinds[name] = 'int'
+        elif type_code in FLOAT_TYPES:
+            kinds[name] = 'float'
+        elif type_code in DATE_TYPES:
+            kinds[name] = 'date'
+        elif flags & FieldFlag.ENUM:
+            kinds[name] = 'enum'
+        else:
+            kinds[name] = 'str'
+    return kinds
+
+
+# ==========================================
+# 2. STREAMING ROWS
+# ==========================================
+
+def stream_rows(connection, sql, params=None, chunk_size=CHUNK_ROWS):
+    """Run a SELECT and yield its rows as lists of tuples, chunk_size at a time"""
+    for _, rows in stream_chunks(connection, sql, params, chunk_size):
+        yield rows
+
+
+def stream_chunks(connection, sql, params=None, chunk_size=CHUNK_ROWS):
+    """Yield (cursor.description, list of row tuples) per chunk"""
+    cursor = connection.cursor(buffered=False)
+    finished = False
+    try:
+        cursor.execute(sql, params or ())
+        description = cursor.description
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                finished = True
+                return
+            yield description, rows
+    finally:
+        if not finished:
+            # The consumer stopped early (break / exception) - the server is
+            # still sending rows, which must be read before the next query
+            try:
+                while cursor.fetchmany(chunk_size):
+                    pass
+            except Exception:
+                pass
+        cursor.close()
+
+
+def stream_columns(connection, sql, params=None, chunk_size=CHUNK_ROWS):
+    """
+    Yield {column: values} per chunk - whole-number columns as array('q'),
+    decimal/float columns as array('d') (NULL -> nan), others as lists
+    A whole-number column holding NULLs stays a list of ints/None
+    """
+    kinds = None
+    for description, rows in stream_chunks(connection, sql, params, chunk_size):
+        if kinds is None:
+            kinds = column_kinds(description)
+        columns = {}
+        for column, values in zip(description, zip(*rows)):
+            name, kind = column[0], kinds[column[0]]
+            if kind == 'int' and None not in values:
+                columns[name] = array('q', values)
+            elif kind == 'float':
+                columns[name] = array('d', [float('nan') if value is None else float(value) for value in values])
+            else:
+                columns[name] = list(values)
+        yield columns
+
+
+# ==========================================
+# 3. PANDAS CHUNKS
+# ==========================================
+
+def stream_dataframes(connection, sql, params=None, chunk_size=CHUNK_ROWS, dtypes=None):
+    """
+    Yield one typed pandas DataFrame per chunk:
+        int -> Int64 (NULL-safe), decimal/float -> float64,
+        date/datetime -> datetime64, ENUM -> category, text -> object
+    dtypes: {column: dtype} to override the guess, e.g. {'city': 'category'}
+    """
+    if pd is None:
+        raise RuntimeError("stream_dataframes() needs pandas - pip install pandas "
+                           "(or use stream_columns())")
+    kinds = None
+    for description, rows in stream_chunks(connection, sql, params, chunk_size):
+        if kinds is None:
+            kinds = column_kinds(description)
+        frame = pd.DataFrame.from_records(rows, columns=[column[0] for column in description])
+        for name, kind in kinds.items():
+            if dtypes and name in dtypes:
+                frame[name] = frame[name].astype(dtypes[name])
+            elif kind == 'int':
+                frame[name] = frame[name].astype('Int64')
+            elif kind == 'float':
+                frame[name] = frame[name].astype('float64')   # Decimal / None -> float / NaN
+            elif kind == 'date':
+                frame[name] = pd.to_datetime(frame[name])
+            elif kind == 'enum':
+                frame[name] = frame[name].astype('category')
+        yield frame
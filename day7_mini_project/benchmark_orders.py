@@ -0,0 +1,333 @@
+# DAY 7: Benchmark - How does the order pipeline scale?
+# Generates synthetic orders_data.csv files (same columns, realistic skew),
+# times each stage (load, aggregate, report build, filtered export) for every
+# mode and appends rows/sec + peak memory to a JSON-lines results file.
+#
+#   python day7_mini_project/benchmark_orders.py --sizes 1e3 1e4 1e5 1e6
+#   python day7_mini_project/benchmark_orders.py --sizes 1e7 1e8 --modes stream parallel
+#   python day7_mini_project/benchmark_orders.py --sizes 1e7 --readers      (DictReader vs typed reader)
+#
+# Every (size, mode) run happens in its own child process, so the peak
+# memory of one run never leaks into the next one. The 'cached' mode's
+# sidecar is built by a separate warm-up process before its timed run.
+
+import argparse
+import csv
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+from order_engine import (
+    stream_orders, summarize_orders, summarize_csv, summarize_csv_parallel, build_report_lines, read_header
+)
+from order_store import load_store, summarize_store, rows_with, store_rows
+from store_cache import cached_store
+from partitioned_writer import open_partitions, write_partitioned, close_partitions
+from csv_output import open_output, write_rows, close_output, abort_output, start_writer_thread, stop_writer_thread
+# Day 4's typed reader (order_engine puts the day4 folder on sys.path)
+from typed_csv import read_typed, read_columns
+
+try:
+    import resource   # Unix only
+except ImportError:
+    resource = None
+
+MODES = ('memory', 'stream', 'parallel', 'columnar', 'cached')
+READERS = ('dictreader', 'typed', 'typed-columns')
+EXPORT_STATUSES = ('completed', 'pending')
+
+# ==========================================
+# 1. SYNTHETIC DATA (SAME SCHEMA AS DAY 7)
+# ==========================================
+
+FIELDNAMES = ["order_id", "customer_name", "service_type", "city", "amount", "status", "date", "technician"]
+
+# A few big cities get most of the orders
+CITIES = ["Lahore", "Karachi", "Islamabad", "Rawalpindi", "Faisalabad", "Multan", "Peshawar", "Quetta"]
+CITY_WEIGHTS = [30, 28, 12, 10, 8, 6, 4, 2]
+
+STATUSES = ["completed", "pending", "in_progress", "cancelled"]
+STATUS_WEIGHTS = [60, 22, 14, 4]
+
+# (service_type, typical amounts)
+SERVICES = [("windshield_replacement", [3500, 3800, 4200]), ("windshield_repair", [1200, 1500, 1800])]
+SERVICE_WEIGHTS = [55, 45]
+
+TECHNICIANS = [f"Tech {i:02d}" for i in range(1, 41)]
+# Zipf-like: the first technicians take far more jobs than the last ones
+TECHNICIAN_WEIGHTS = [1 / rank for rank in range(1, 41)]
+
+FIRST_DAY = date(2023, 1, 1).toordinal()
+DAYS = 730
+
+# Column types for the typed reader (see day4_file_handling/typed_csv.py)
+ORDER_SCHEMA = [
+    ("order_id", "int"), ("customer_name", "str"), ("service_type", "category"), ("city", "category"),
+    ("amount", "int"), ("status", tuple(STATUSES)), ("date", "date"), ("technician", "category"),
+]
+
+
+def generate_orders_csv(path, rows, seed=7, batch=100_000):
+    """Write `rows` synthetic orders to path (skewed cities, technicians and customers)"""
+    rng = random.Random(seed)
+    customers = max(rows // 3, 1)
+    dates = [date.fromordinal(FIRST_DAY + d).isoformat() for d in range(DAYS)]
+
+    with open(path, 'w', newline='', buffering=1024 * 1024) as file:
+        writer = csv.writer(file)
+        writer.writerow(FIELDNAMES)
+        order_id = 1
+        while order_id <= rows:
+            n = min(batch, rows - order_id + 1)
+            cities = rng.choices(CITIES, CITY_WEIGHTS, k=n)
+            statuses = rng.choices(STATUSES, STATUS_WEIGHTS, k=n)
+            services = rng.choices(SERVICES, SERVICE_WEIGHTS, k=n)
+            techs = rng.choices(TECHNICIANS, TECHNICIAN_WEIGHTS, k=n)
+            days = rng.choices(dates, k=n)
+            batch_rows = []
+            for i in range(n):
+                # Most customers come once; fleet accounts (log-uniform ids) come back a lot
+                if rng.random() < 0.8:
+                    customer = rng.randint(1, customers)
+                else:
+                    customer = int(customers ** rng.random())
+                service, amounts = services[i]
+                batch_rows.append([order_id + i, f"Customer {customer}", service, cities[i],
+                                   rng.choice(amounts), statuses[i], days[i], techs[i]])
+            writer.writerows(batch_rows)
+            order_id += n
+
+
+def data_file(data_dir, rows):
+    """Reuse an already generated file of the same size"""
+    path = os.path.join(data_dir, f"orders_{rows}.csv")
+    if not os.path.exists(path):
+        print(f"📝 Generating {rows:,} orders -> {path}")
+        os.makedirs(data_dir, exist_ok=True)
+        started = time.perf_counter()
+        generate_orders_csv(path + '.tmp', rows)
+        os.replace(path + '.tmp', path)
+        print(f"   ✓ done in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+# ==========================================
+# 2. ONE RUN (INSIDE A CHILD PROCESS)
+# ==========================================
+
+def peak_rss_bytes():
+    """Peak resident memory of this process and of its finished children"""
+    if resource is None:
+        return None, None
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return own, children
+
+
+def run_reader(csv_file, reader):
+    """
+    Time one way of reading typed orders: DictReader + converting by hand
+    (what the scripts do today) vs the schema-driven typed reader
+    """
+    errors = []
+    started = time.perf_counter()
+    if reader == 'dictreader':
+        rows = 0
+        with open(csv_file, 'r', newline='') as file:
+            for order in csv.DictReader(file):
+                try:
+                    order['order_id'] = int(order['order_id'])
+                    order['amount'] = int(order['amount'])
+                    order['date'] = date.fromisoformat(order['date']).toordinal()
+                except ValueError:
+                    errors.append(order)
+                    continue
+                rows += 1
+    elif reader == 'typed':
+        rows = 0
+        for _ in read_typed(csv_file, ORDER_SCHEMA, errors):
+            rows += 1
+    else:
+        rows = read_columns(csv_file, ORDER_SCHEMA, errors)['rows']
+    seconds = time.perf_counter() - started
+
+    rss, _ = peak_rss_bytes()
+    return {
+        'rows': rows,
+        'mode': f"reader:{reader}",
+        'workers': 1,
+        'file_bytes': os.path.getsize(csv_file),
+        'stages': {'read': round(seconds, 4)},
+        'total_seconds': round(seconds, 4),
+        'rows_per_sec': round(rows / seconds) if seconds else None,
+        'peak_rss_bytes': rss,
+        'bad_rows': len(errors),
+    }
+
+
+def run_one(csv_file, mode, workers=None):
+    """
+    Time every stage of one mode on one file
+    Fused modes do load + aggregate + export in a single scan ('scan' stage)
+    """
+    stages = {}
+    out_dir = tempfile.mkdtemp(prefix='order_bench_')
+    exports = {status: os.path.join(out_dir, f"{status}.csv") for status in EXPORT_STATUSES}
+
+    try:
+        started = time.perf_counter()
+        if mode == 'memory':
+            orders = list(stream_orders(csv_file))
+            stages['load'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            summary = summarize_orders(orders)
+            stages['aggregate'] = time.perf_counter() - started
+
+        elif mode == 'stream':
+            writer = open_partitions('status', read_header(csv_file)[0], exports)
+            summary = summarize_csv(csv_file, [writer])
+            close_partitions(writer)
+            stages['scan'] = time.perf_counter() - started
+
+        elif mode == 'parallel':
+            summary, _ = summarize_csv_parallel(csv_file, exports, workers=workers)
+            stages['scan'] = time.perf_counter() - started
+
+        elif mode in ('columnar', 'cached'):
+            if mode == 'cached':
+                # The warm-up process (see main) already wrote the sidecar
+                store, _ = cached_store(csv_file)
+            else:
+                store = load_store(csv_file)
+            stages['load'] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            summary = summarize_store(store)
+            stages['aggregate'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        build_report_lines(summary, datetime.now())
+        stages['report'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if mode == 'memory':
+            writer = open_partitions('status', list(orders[0].keys()) if orders else FIELDNAMES, exports)
+            for order in orders:
+                write_partitioned(writer, order)
+            close_partitions(writer)
+            stages['export'] = time.perf_counter() - started
+        elif mode in ('columnar', 'cached'):
+            # The same writer path as order_analysis.py --mode columnar
+            writer_thread = start_writer_thread()
+            try:
+                for status, path in exports.items():
+                    indexes = rows_with(store, 'status', status)
+                    if indexes:
+                        output = open_output(path, store['fieldnames'], writer_thread)
+                        try:
+                            write_rows(output, store_rows(store, indexes))
+                            close_output(output)
+                        except BaseException:
+                            abort_output(output)
+                            raise
+            finally:
+                stop_writer_thread(writer_thread)
+            stages['export'] = time.perf_counter() - started
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+    rss, children_rss = peak_rss_bytes()
+    total = sum(stages.values())
+    rows = summary['total_orders']
+    return {
+        'rows': rows,
+        'mode': mode,
+        'workers': (workers or os.cpu_count()) if mode == 'parallel' else 1,
+        'file_bytes': os.path.getsize(csv_file),
+        'stages': {name: round(seconds, 4) for name, seconds in stages.items()},
+        'total_seconds': round(total, 4),
+        'rows_per_sec': round(rows / total) if total else None,
+        'peak_rss_bytes': rss,
+        'peak_child_rss_bytes': children_rss or None,
+    }
+
+
+# ==========================================
+# 3. THE BENCHMARK LOOP
+# ==========================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the day 7 order pipeline")
+    parser.add_argument('--sizes', nargs='+', default=['1e3', '1e4', '1e5', '1e6'],
+                        help="row counts to test, e.g. 1e3 1e5 1e8")
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    parser.add_argument('--readers', action='store_true',
+                        help="compare CSV readers (DictReader vs typed) instead of pipeline modes")
+    parser.add_argument('--workers', type=int, default=None, help="processes for the parallel mode")
+    parser.add_argument('--data-dir', default='bench_data', help="where generated CSV files are kept")
+    parser.add_argument('--results', default='benchmark_results.jsonl', help="JSON-lines results file")
+    parser.add_argument('--run-one', nargs=2, metavar=('CSV', 'MODE'), help=argparse.SUPPRESS)
+    parser.add_argument('--warm-cache', metavar='CSV', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.warm_cache:
+        # Child process: parse the CSV once and write its sidecar cache
+        cached_store(args.warm_cache)
+        return
+
+    if args.run_one:
+        # Child process: run once and hand the result back as JSON
+        csv_file, mode = args.run_one
+        if mode.startswith('reader:'):
+            print(json.dumps(run_reader(csv_file, mode[len('reader:'):])))
+        else:
+            print(json.dumps(run_one(csv_file, mode, args.workers)))
+        return
+
+    print("=" * 70)
+    print("DAY 7: ORDER PIPELINE BENCHMARK")
+    print("=" * 70)
+
+    sizes = [int(float(size)) for size in args.sizes]
+    script = os.path.abspath(__file__)
+    runs = [f"reader:{reader}" for reader in READERS] if args.readers else args.modes
+    run_info = {'python': sys.version.split()[0], 'cpus': os.cpu_count(),
+                'timestamp': datetime.now().isoformat(timespec='seconds')}
+
+    print(f"\n{'rows':>12} {'mode':>20} {'seconds':>9} {'rows/sec':>12} {'peak RSS':>10}  stages")
+    print("-" * 80)
+    for rows in sizes:
+        csv_file = data_file(args.data_dir, rows)
+        for mode in runs:
+            if mode == 'cached':
+                # Parsing + writing the sidecar would land in the timed child's
+                # load time and peak memory - do it in a process of its own
+                subprocess.run([sys.executable, script, '--warm-cache', csv_file], check=True)
+            command = [sys.executable, script, '--run-one', csv_file, mode]
+            if args.workers:
+                command += ['--workers', str(args.workers)]
+            output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+            result = dict(run_info, **json.loads(output.strip().splitlines()[-1]))
+
+            with open(args.results, 'a') as file:
+                file.write(json.dumps(result) + "\n")
+
+            rss = f"{result['peak_rss_bytes'] / 1024 / 1024:.0f} MB" if result['peak_rss_bytes'] else "n/a"
+            stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result['stages'].items())
+            print(f"{rows:>12,} {mode:>20} {result['total_seconds']:>9.2f} "
+                  f"{result['rows_per_sec'] or 0:>12,} {rss:>10}  {stages}")
+
+    print(f"\n✓ Results appended to {args.results}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# DAY 7: Reports Over a Whole Folder of Order Files
+# Branches drop a new orders CSV every day. This script keeps a catalog of
+# the folder (see day4_file_handling/file_catalog.py), picks the files a
+# query needs - skipping those whose dates can't match without opening
+# them - and aggregates the rest in parallel, one file per process.
+#
+#   python day7_mini_project/catalog_orders.py --root drops/
+#   python day7_mini_project/catalog_orders.py --root drops/ --glob 'lahore/*' --from 2024-03-01 --to 2024-03-31
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+from order_engine import summarize_files, build_report_lines
+# order_engine puts day4_file_handling on sys.path
+from file_catalog import update_catalog, select_files, catalog_totals
+
+# Columns the order summary reads from every row
+REQUIRED_COLUMNS = ('customer_name', 'service_type', 'city', 'amount', 'status', 'date', 'technician')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Order report over many CSV files")
+    parser.add_argument('--root', required=True, help="folder with order CSVs (searched recursively)")
+    parser.add_argument('--glob', default='*', help="only files whose path (inside root) matches, e.g. 'lahore/*'")
+    parser.add_argument('--from', dest='first_day', default=None, help="first order date, YYYY-MM-DD")
+    parser.add_argument('--to', dest='last_day', default=None, help="last order date, YYYY-MM-DD")
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: one per CPU core)")
+    parser.add_argument('--report', default='catalog_report.txt', help="where to write the report")
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("DAY 7: ORDER REPORT OVER A FOLDER OF FILES")
+    print("=" * 70)
+
+    started = time.perf_counter()
+    catalog, scanned = update_catalog(args.root, workers=args.workers)
+    totals = catalog_totals(catalog)
+    print(f"\n📚 Catalog: {totals['files']} files, {totals['rows']:,} rows, {totals['bytes']:,} bytes "
+          f"({scanned} scanned, {totals['files'] - scanned} from cache) "
+          f"in {time.perf_counter() - started:.2f}s")
+
+    names, skipped = select_files(catalog, args.glob, args.first_day, args.last_day)
+    usable = [name for name in names
+              if all(column in catalog['files'][name]['fieldnames'] for column in REQUIRED_COLUMNS)]
+    for name in sorted(set(names) - set(usable)):
+        print(f"   ⚠️  {name}: not an orders file (missing columns) - ignored")
+    print(f"🔎 {len(usable)} file(s) match, {len(skipped)} skipped by date range without opening them")
+
+    started = time.perf_counter()
+    summary = summarize_files([os.path.join(args.root, name) for name in usable],
+                              args.first_day, args.last_day, args.workers)
+    print(f"⚡ Aggregated {summary['total_orders']:,} orders in {time.perf_counter() - started:.2f}s")
+
+    with open(args.report, 'w', encoding='utf-8') as file:
+        file.write("\n".join(build_report_lines(summary, datetime.now())) + "\n")
+    print(f"✓ Report saved to {args.report}")
+
+
+if __name__ == '__main__':
+    main()
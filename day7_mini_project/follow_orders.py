@@ -0,0 +1,70 @@
+# DAY 7: Live Order Metrics (Follow Mode)
+# The production order log keeps growing all day. Instead of re-running the
+# full report, follow the file like `tail -F`: only newly appended rows are
+# read and folded into the running totals, a few seconds after they land.
+#
+#   python day7_mini_project/follow_orders.py --input orders_log.csv
+#   python day7_mini_project/follow_orders.py --input orders_log.csv --report live_report.txt --interval 5
+#
+# Progress is checkpointed (offset + inode) every --checkpoint-seconds and on
+# exit, so stopping with Ctrl+C and starting again continues where it left
+# off. Log rotation and truncation are handled (see day4_file_handling/tail_follow.py).
+
+import argparse
+from datetime import datetime
+
+from order_engine import follow_csv, build_report_lines, detect_compression, CHECKPOINT_SECONDS
+# Day 4's output layer (order_engine puts day4_file_handling on sys.path)
+from csv_output import write_file
+
+
+def write_report(path, summary):
+    """Rewrite the full report (csv_output.write_file - never half a report on disk)"""
+    write_file(path, "\n".join(build_report_lines(summary, datetime.now())) + "\n")
+
+
+def status_line(summary, new_rows, event):
+    """One line per batch: what arrived and where the totals stand"""
+    total = summary['total_orders']
+    completed = summary['status_counts'].get('completed', {}).get('count', 0)
+    rate = completed / total * 100 if total else 0
+    note = f" ({event})" if event else ""
+    return (f"[{datetime.now():%H:%M:%S}] +{new_rows:,} orders{note} -> "
+            f"{total:,} orders | Rs.{summary['total_revenue']:,} | completed {rate:.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Follow a growing orders CSV and keep live totals")
+    parser.add_argument('--input', required=True, help="orders CSV that rows are appended to")
+    parser.add_argument('--checkpoint', default=None,
+                        help="default: <input>.follow-checkpoint.json (not the one order_analysis.py "
+                             "--mode incremental uses - they save different exports)")
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between polls")
+    parser.add_argument('--report', default=None, help="rewrite this report file after every batch")
+    parser.add_argument('--checkpoint-seconds', type=float, default=CHECKPOINT_SECONDS,
+                        help="rewrite the checkpoint at most this often (it is also saved on exit)")
+    parser.add_argument('--idle-polls', type=int, default=None,
+                        help="stop after this many polls in a row without new rows (default: run forever)")
+    args = parser.parse_args()
+
+    if detect_compression(args.input):
+        parser.error(f"{args.input} is compressed - follow mode needs a plain CSV")
+    checkpoint_file = args.checkpoint or args.input + ".follow-checkpoint.json"
+
+    print(f"👀 Following {args.input} (Ctrl+C to stop)")
+    updates = follow_csv(args.input, checkpoint_file, poll_interval=args.interval,
+                         idle_polls=args.idle_polls, checkpoint_seconds=args.checkpoint_seconds)
+    try:
+        for summary, _, new_rows, event in updates:
+            print(status_line(summary, new_rows, event), flush=True)
+            if args.report:
+                write_report(args.report, summary)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        updates.close()   # saves the rows folded in since the last checkpoint
+    print(f"✓ Stopped - progress saved in {checkpoint_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+# DAY 7: Order Rollup Cube
+# One cell per (city, status, service_type, technician) combination
+# holding [count, revenue]. ANY breakdown - revenue by city and technician,
+# orders by service and status, ... - is answered by adding up cells,
+# without touching the order rows again.
+# (Like SQL GROUP BY ... WITH ROLLUP, computed once and kept around)
+#
+# The cube has no date: its size depends on how many cities, statuses,
+# services and technicians exist, not on how many orders were read, so it
+# stays small in streaming mode and in checkpoints. Trends use a separate
+# (date, status) aggregate. The full cube WITH the date grows with the data
+# (~450k cells for 1M orders) - build it only when you need it
+# (build_full_cube(), or order_store.cube_from_store(store, FULL_CUBE_DIMENSIONS)).
+
+from order_dates import day_number
+
+CUBE_DIMENSIONS = ('city', 'status', 'service_type', 'technician')
+# 'date' is stored as an integer day number (see order_dates.py)
+TREND_DIMENSIONS = ('date', 'status')
+FULL_CUBE_DIMENSIONS = CUBE_DIMENSIONS + ('date',)
+
+
+# ==========================================
+# 1. BUILDING THE CUBE
+# ==========================================
+
+def add_batch(cube, counts, cell_key=None):
+    """
+    Add many orders at once
+    counts: Counter of (dimension values..., int amount) tuples -> orders.
+    One cell update per DISTINCT tuple: a batch of thousands of orders
+    touches a few thousand cells at most (amounts repeat a lot)
+    cell_key: turns the dimension values into the cell key (default: as they are)
+    """
+    for values, n in counts.items():
+        key = values[:-1] if cell_key is None else cell_key(values[:-1])
+        revenue = values[-1] * n
+        cell = cube.get(key)
+        if cell is None:
+            cube[key] = [n, revenue]
+        else:
+            cell[0] += n
+            cell[1] += revenue
+
+
+def trend_key(values):
+    """('2024-01-15', 'completed') -> (day number, 'completed') for the trend"""
+    return (day_number(values[0]), values[1])
+
+
+def build_full_cube(orders):
+    """
+    Cube over FULL_CUBE_DIMENSIONS (every dimension + date) - on request
+    only, it has up to one cell per order
+    """
+    cube = {}
+    for order in orders:
+        key = (order['city'], order['status'], order['service_type'], order['technician'],
+               day_number(order['date']))
+        cell = cube.get(key)
+        if cell is None:
+            cube[key] = [1, order['amount']]
+        else:
+            cell[0] += 1
+            cell[1] += order['amount']
+    return cube
+
+
+def merge_cubes(cube, other):
+    """Add the cells of `other` into `cube`"""
+    for key, (count, revenue) in other.items():
+        cell = cube.get(key)
+        if cell is None:
+            cube[key] = [count, revenue]
+        else:
+            cell[0] += count
+            cell[1] += revenue
+    return cube
+
+
+# ==========================================
+# 2. ASKING THE CUBE QUESTIONS
+# ==========================================
+
+def rollup(cube, dimensions, cube_dimensions=CUBE_DIMENSIONS):
+    """
+    Group a cube by any subset of its dimensions
+    rollup(cube, ['city', 'technician']) -> {('Lahore', 'Ahmed'): {'count': 3, 'revenue': 10500}, ...}
+    cube_dimensions: what the cube's keys are (TREND_DIMENSIONS for the trend)
+    """
+    positions = [cube_dimensions.index(name) for name in dimensions]
+    result = {}
+    for key, (count, revenue) in cube.items():
+        group = tuple(key[p] for p in positions)
+        stats = result.get(group)
+        if stats is None:
+            result[group] = {'count': count, 'revenue': revenue}
+        else:
+            stats['count'] += count
+            stats['revenue'] += revenue
+    return result
+
+
+# ==========================================
+# 3. SAVING THE CUBE (JSON CHECKPOINTS)
+# ==========================================
+
+def cube_to_json(cube):
+    """JSON has no tuple keys - store the cells as [key..., count, revenue] lists"""
+    return [list(key) + cell for key, cell in cube.items()]
+
+
+def cube_from_json(cells):
+    """Inverse of cube_to_json() (for any cube - the last two values are the cell)"""
+    return {tuple(cell[:-2]): cell[-2:] for cell in cells}
@@ -0,0 +1,79 @@
+# DAY 7: Dates & Time-Series Rollups
+# Orders have MANY rows but only a FEW distinct dates, so every date string
+# is parsed once and cached. Dates are kept as integer day numbers
+# (date.toordinal(): days since 0001-01-01), which makes week and month
+# buckets simple arithmetic instead of datetime work per order.
+
+from datetime import date
+
+# Day number used for empty or unreadable dates
+UNKNOWN_DAY = 0
+
+# '2024-01-15' -> 738900, filled the first time each string is seen
+_day_numbers = {}
+# day number -> day number of the 1st of its month
+_month_starts = {}
+
+
+# ==========================================
+# 1. PARSING (CACHED)
+# ==========================================
+
+def day_number(text):
+    """Parse a 'YYYY-MM-DD' string to a day number - each distinct string only once"""
+    day = _day_numbers.get(text)
+    if day is None:
+        try:
+            day = date.fromisoformat(text).toordinal()
+        except ValueError:
+            day = UNKNOWN_DAY
+        _day_numbers[text] = day
+    return day
+
+
+# ==========================================
+# 2. TIME BUCKETS
+# ==========================================
+
+def bucket_of(day, bucket):
+    """Day number of the first day of the 'day', 'week' (Monday) or 'month' bucket"""
+    if day == UNKNOWN_DAY or bucket == 'day':
+        return day
+    if bucket == 'week':
+        # Day 1 (0001-01-01) was a Monday, so (day - 1) % 7 is the weekday
+        return day - (day - 1) % 7
+    start = _month_starts.get(day)
+    if start is None:
+        start = _month_starts[day] = date.fromordinal(day).replace(day=1).toordinal()
+    return start
+
+
+def period_label(start, bucket):
+    """Readable label for a bucket: '2024-01-15', 'Week of 2024-01-15', '2024-01'"""
+    if start == UNKNOWN_DAY:
+        return "unknown date"
+    day = date.fromordinal(start)
+    if bucket == 'month':
+        return day.strftime('%Y-%m')
+    if bucket == 'week':
+        return f"Week of {day.isoformat()}"
+    return day.isoformat()
+
+
+def time_series(date_status, bucket):
+    """
+    Revenue and status trend per day/week/month
+    date_status is rollup(summary['trend'], ['date', 'status'], TREND_DIMENSIONS)
+    - no order rows needed
+    -> {bucket start: {'count': n, 'revenue': total, 'completed': n, ...}} oldest first
+    """
+    series = {}
+    for (day, status), stats in date_status.items():
+        start = bucket_of(day, bucket)
+        row = series.get(start)
+        if row is None:
+            row = series[start] = {'count': 0, 'revenue': 0}
+        row['count'] += stats['count']
+        row['revenue'] += stats['revenue']
+        row[status] = row.get(status, 0) + stats['count']
+    return dict(sorted(series.items()))
@@ -0,0 +1,738 @@
+# DAY 7: Order Aggregation Engine
+# One scan over the orders builds EVERY metric the report needs
+# (like running one big SQL query with several GROUP BYs instead of four)
+
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from itertools import takewhile
+from operator import itemgetter
+
+from order_cube import add_batch, trend_key, merge_cubes, rollup, cube_to_json, cube_from_json
+from order_cube import CUBE_DIMENSIONS, TREND_DIMENSIONS
+from order_dates import time_series, period_label
+from order_topk import new_topk, topk_add_totals, topk_items, merge_topk
+
+# Reuse Day 4's reader for .gz/.bz2/.xz files (day folders are not packages)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'day4_file_handling'))
+from compressed_files import detect_compression, open_text
+from process_pool import process_pool
+from tail_follow import open_tail, close_tail, follow
+from csv_output import open_output, write_data, close_output, abort_output, write_file
+# partitioned_writer uses Day 4's csv_output.py, so it comes after the path
+from partitioned_writer import write_partitioned
+
+# Columns ranked with bounded-memory top-K trackers, by order count and revenue.
+# Only customers need one - there are few technicians and cities, and
+# tech_stats / city_stats already hold their exact totals
+HEAVY_HITTER_COLUMNS = ('customer_name',)
+# Orders queued before they are folded into the trackers and cubes (see fold_batch)
+FOLD_ROWS = 16384
+# What is queued per order - a small tuple, not the whole row
+BATCH_COLUMNS = HEAVY_HITTER_COLUMNS + CUBE_DIMENSIONS + ('date', 'amount')
+BATCH_FIELDS = itemgetter(*BATCH_COLUMNS)
+# The cube's and the trend's (dimension values..., amount) out of a queued tuple
+CUBE_FIELDS = itemgetter(*[BATCH_COLUMNS.index(name) for name in CUBE_DIMENSIONS + ('amount',)])
+TREND_FIELDS = itemgetter(*[BATCH_COLUMNS.index(name) for name in TREND_DIMENSIONS + ('amount',)])
+
+# ==========================================
+# 1. THE SUMMARY OBJECT
+# ==========================================
+
+def new_summary():
+    """
+    Empty summary - every metric starts at zero
+    (Think of it as the result row of a report query)
+    """
+    return {
+        'total_orders': 0,
+        'total_revenue': 0,
+        'completed_count': 0,
+        'pending_count': 0,
+        'status_counts': {},
+        'city_stats': {},
+        'tech_stats': {},
+        'service_stats': {},
+        'cube': {},    # city x status x service x technician - see order_cube.py
+        'trend': {},   # (day number, status) -> [count, revenue]
+        # 'customer_name:revenue' -> top-K tracker (see order_topk.py)
+        'heavy_hitters': {f"{column}:{measure}": new_topk()
+                          for column in HEAVY_HITTER_COLUMNS for measure in ('orders', 'revenue')},
+        'batch': [],   # orders not in the trackers/cubes yet - fold_batch() before reading them
+    }
+
+
+# ==========================================
+# 2. SINGLE-PASS AGGREGATION
+# ==========================================
+
+def add_order(summary, order):
+    """
+    Fold one order (dict with int 'amount') into the summary
+    Only the running totals are updated per order - the per-city/status/...
+    stats, the cube, the trend and the top-K trackers are updated per batch
+    """
+    amount = order['amount']
+    status = order['status']
+
+    summary['total_orders'] += 1
+    summary['total_revenue'] += amount
+    if status == 'completed':
+        summary['completed_count'] += 1
+    elif status == 'pending':
+        summary['pending_count'] += 1
+
+    batch = summary['batch']
+    batch.append(BATCH_FIELDS(order))
+    if len(batch) >= FOLD_ROWS:
+        fold_batch(summary)
+
+
+def fold_batch(summary):
+    """
+    Fold the queued orders into the top-K trackers, the cube and the trend:
+    exact totals per customer for the whole batch (one Counter), then one
+    merge per tracker - a Space-Saving update per row evicts on almost every
+    row. The batch's cube cells (one Counter) also give the status, city,
+    technician and service stats, one update per distinct cell, not per order
+    Every function that returns a summary calls this first
+    """
+    batch = summary['batch']
+    if not batch:
+        return summary
+    heavy_hitters = summary['heavy_hitters']
+    for position, column in enumerate(HEAVY_HITTER_COLUMNS):
+        orders = Counter(map(itemgetter(position), batch))
+        revenue = {}
+        for (key, amount), n in Counter(map(itemgetter(position, -1), batch)).items():
+            revenue[key] = revenue.get(key, 0) + amount * n
+        topk_add_totals(heavy_hitters[column + ':orders'], orders)
+        topk_add_totals(heavy_hitters[column + ':revenue'], revenue)
+
+    # Cells come out in first-seen order, so new cities/statuses/... are
+    # added to the stats in the same order as row by row
+    cells = Counter(map(CUBE_FIELDS, batch))
+    add_batch(summary['cube'], cells)
+    add_batch(summary['trend'], Counter(map(TREND_FIELDS, batch)), trend_key)
+    status_counts = summary['status_counts']
+    city_stats = summary['city_stats']
+    tech_stats = summary['tech_stats']
+    service_stats = summary['service_stats']
+    for (city, status, service, tech, amount), n in cells.items():
+        revenue = amount * n
+        for stats_by, name in ((status_counts, status), (city_stats, city), (service_stats, service)):
+            stats = stats_by.get(name)
+            if stats is None:
+                stats = stats_by[name] = {'count': 0, 'revenue': 0}
+            stats['count'] += n
+            stats['revenue'] += revenue
+
+        stats = tech_stats.get(tech)
+        if stats is None:
+            stats = tech_stats[tech] = {'completed': 0, 'pending': 0, 'in_progress': 0, 'revenue': 0}
+        stats[status] = stats.get(status, 0) + n
+        stats['revenue'] += revenue
+    summary['batch'] = []
+    return summary
+
+
+def summarize_orders(orders):
+    """Build the full summary in ONE loop over the orders"""
+    summary = new_summary()
+    for order in orders:
+        add_order(summary, order)
+    return fold_batch(summary)
+
+
+def merge_summaries(summary, other):
+    """
+    Add the counts of `other` into `summary` (used to combine worker results)
+    Merge partials in file order so ties in the report resolve the same way
+    """
+    fold_batch(summary)
+    fold_batch(other)
+    for key in ('total_orders', 'total_revenue', 'completed_count', 'pending_count'):
+        summary[key] += other[key]
+
+    for key in ('status_counts', 'city_stats', 'tech_stats', 'service_stats'):
+        target = summary[key]
+        for name, stats in other[key].items():
+            if name not in target:
+                target[name] = dict(stats)
+            else:
+                for field, value in stats.items():
+                    target[name][field] = target[name].get(field, 0) + value
+
+    merge_cubes(summary['cube'], other['cube'])
+    merge_cubes(summary['trend'], other['trend'])
+    for name, topk in other['heavy_hitters'].items():
+        merge_topk(summary['heavy_hitters'][name], topk)
+    return summary
+
+
+# ==========================================
+# 3. STREAMING MODE (CONSTANT MEMORY)
+# ==========================================
+
+def stream_orders(csv_file):
+    """
+    Yield orders one at a time straight from the CSV
+    (Like Laravel's Order::cursor() - the full list is never built)
+    Compressed files (.gz/.bz2/.xz) are decompressed on the fly
+    """
+    with open_text(csv_file) as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            row['amount'] = int(row['amount'])
+            yield row
+
+
+def summarize_csv(csv_file, writers=(), workers=None):
+    """
+    Stream csv_file once: update the summary AND feed every row to the
+    partitioned writers (see partitioned_writer.py) in the same pass
+    The caller opens and closes the writers
+    workers: processes used to inflate multi-member .gz files
+    """
+    summary = new_summary()
+    with open_text(csv_file, workers) as file:
+        reader = csv.DictReader(file)
+        for row in reader:
+            row['amount'] = int(row['amount'])
+            add_order(summary, row)
+            for writer in writers:
+                write_partitioned(writer, row)
+    return fold_batch(summary)
+
+
+# ==========================================
+# 4. PARALLEL MODE (ONE SHARD PER CORE)
+# ==========================================
+
+def read_header(csv_file):
+    """Return (fieldnames, raw header bytes) of a CSV file (compressed or not)"""
+    with open_text(csv_file, workers=1) as file:
+        header = file.readline()
+    fieldnames = next(csv.reader([header]))
+    return fieldnames, header.encode('utf-8')
+
+
+def require_plain_csv(csv_file):
+    """Byte offsets only mean something in an uncompressed file"""
+    if detect_compression(csv_file):
+        raise ValueError(f"{csv_file} is compressed - this mode needs a plain CSV (use --mode stream)")
+
+
+def split_byte_ranges(csv_file, parts):
+    """
+    Split the data part of csv_file into `parts` (start, end) byte ranges
+    Every boundary is moved forward to the start of a line, so no row is cut
+    (Order exports never contain newlines inside a field)
+    """
+    _, header = read_header(csv_file)
+    data_start = len(header)
+    size = os.path.getsize(csv_file)
+    step = max((size - data_start) // parts, 1)
+
+    boundaries = [data_start]
+    with open(csv_file, 'rb') as file:
+        for i in range(1, parts):
+            guess = data_start + i * step
+            if guess >= size:
+                break
+            # Land just after the newline that ends the row containing `guess - 1`
+            file.seek(guess - 1)
+            file.readline()
+            boundary = file.tell()
+            if boundary > boundaries[-1] and boundary < size:
+                boundaries.append(boundary)
+    boundaries.append(size)
+
+    return [(boundaries[i], boundaries[i + 1]) for i in range(len(boundaries) - 1)]
+
+
+def read_range_lines(file, start, end):
+    """Yield the raw lines of file between byte offsets start and end"""
+    file.seek(start)
+    position = start
+    while position < end:
+        line = file.readline()
+        if not line:
+            break
+        position += len(line)
+        yield line
+
+
+def fold_lines(lines, fieldnames, summary, exports, export_counts, header=b''):
+    """
+    Fold raw CSV lines (bytes) into summary
+    Matching status rows are copied (raw bytes) into exports[status]:
+    a new export starts with `header`, one that already has rows is appended to
+    Lines equal to the header (e.g. the first line of a rotated file) are skipped
+    Returns the number of bytes consumed
+    """
+    open_files = {}
+    consumed = 0
+
+    try:
+        for line in lines:
+            consumed += len(line)
+            if line == header:
+                continue
+            row = next(csv.reader([line.decode('utf-8')]), None)
+            if not row:
+                continue
+            order = dict(zip(fieldnames, row))
+            order['amount'] = int(order['amount'])
+            add_order(summary, order)
+
+            status = order['status']
+            if status in exports:
+                out = open_files.get(status)
+                if out is None:
+                    if export_counts[status]:
+                        out = open(exports[status], 'ab')
+                    else:
+                        out = open(exports[status], 'wb')
+                        out.write(header)
+                    open_files[status] = out
+                out.write(line)
+                export_counts[status] += 1
+        fold_batch(summary)
+    finally:
+        for out in open_files.values():
+            out.close()
+
+    return consumed
+
+
+def fold_range(csv_file, fieldnames, start, end, summary, exports, export_counts,
+               header=b'', complete_only=False):
+    """
+    Fold the rows between byte offsets start and end into summary (see fold_lines)
+    complete_only=True stops before a last line that has no newline yet
+    Returns the byte offset just after the last row that was folded in
+    """
+    with open(csv_file, 'rb') as file:
+        lines = read_range_lines(file, start, end)
+        if complete_only:
+            lines = takewhile(lambda line: line.endswith(b'\n'), lines)
+        return start + fold_lines(lines, fieldnames, summary, exports, export_counts, header)
+
+
+def summarize_range(task):
+    """
+    Worker: build a partial summary for one byte range
+    Matching status rows go into per-range part files (no header)
+    """
+    csv_file, fieldnames, start, end, part_exports = task
+    summary = new_summary()
+    export_counts = {status: 0 for status in part_exports}
+    fold_range(csv_file, fieldnames, start, end, summary, part_exports, export_counts)
+    return summary, export_counts
+
+
+def summarize_csv_parallel(csv_file, status_exports=None, workers=None):
+    """
+    Same result as summarize_csv(), but each byte range runs in its own process
+    Returns (summary, rows written per status)
+    """
+    require_plain_csv(csv_file)
+    status_exports = status_exports or {}
+    workers = workers or os.cpu_count() or 1
+    fieldnames, header = read_header(csv_file)
+
+    # A few ranges per worker keeps every core busy until the end
+    ranges = split_byte_ranges(csv_file, workers * 4)
+    tasks = []
+    for index, (start, end) in enumerate(ranges):
+        part_exports = {status: f"{path}.part{index}" for status, path in status_exports.items()}
+        tasks.append((csv_file, fieldnames, start, end, part_exports))
+
+    summary = new_summary()
+    export_counts = {status: 0 for status in status_exports}
+    with process_pool(workers) as pool:
+        # map() returns results in range order - merge them in that order
+        for partial, partial_counts in pool.map(summarize_range, tasks):
+            merge_summaries(summary, partial)
+            for status, count in partial_counts.items():
+                export_counts[status] += count
+
+    # Stitch the per-range part files together behind one header
+    for status, path in status_exports.items():
+        parts = [task[4][status] for task in tasks if os.path.exists(task[4][status])]
+        if export_counts[status]:
+            output = open_output(path)
+            try:
+                write_data(output, header)
+                for part in parts:
+                    with open(part, 'rb') as part_file:
+                        for block in iter(lambda: part_file.read(1024 * 1024), b''):
+                            write_data(output, block)
+            except BaseException:
+                abort_output(output)
+                raise
+            close_output(output)
+        for part in parts:
+            os.remove(part)
+
+    return summary, export_counts
+
+
+def summarize_file(task):
+    """
+    Worker: summary of one whole CSV file, optionally only the orders
+    dated first_day..last_day ('YYYY-MM-DD' strings, None = open end)
+    """
+    csv_file, first_day, last_day = task
+    summary = new_summary()
+    for order in stream_orders(csv_file):
+        if (first_day and order['date'] < first_day) or (last_day and order['date'] > last_day):
+            continue
+        add_order(summary, order)
+    return fold_batch(summary)
+
+
+def summarize_files(csv_files, first_day=None, last_day=None, workers=None):
+    """
+    One summary over many CSV files (e.g. daily drops), one file per process
+    Partial summaries are merged in the order the files were given
+    """
+    tasks = [(csv_file, first_day, last_day) for csv_file in csv_files]
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) or 1
+
+    summary = new_summary()
+    with process_pool(workers) as pool:
+        for partial in pool.map(summarize_file, tasks):
+            merge_summaries(summary, partial)
+    return summary
+
+
+# ==========================================
+# 5. INCREMENTAL MODE (APPEND-ONLY FILES)
+# ==========================================
+
+FINGERPRINT_BLOCK = 64 * 1024
+# Follow mode rewrites its checkpoint at most this often (and when it stops)
+CHECKPOINT_SECONDS = 30
+CHECKPOINT_ROWS = 100_000
+
+
+def file_fingerprint(csv_file, offset):
+    """
+    Hash the first and the last 64 KB before `offset`
+    Appending rows never changes these bytes - truncating or rewriting does
+    """
+    with open(csv_file, 'rb') as file:
+        head = file.read(min(offset, FINGERPRINT_BLOCK))
+        tail_start = max(offset - FINGERPRINT_BLOCK, 0)
+        file.seek(tail_start)
+        tail = file.read(offset - tail_start)
+    return hashlib.sha1(head).hexdigest() + ':' + hashlib.sha1(tail).hexdigest()
+
+
+def load_checkpoint(checkpoint_file):
+    """Read a saved checkpoint, or None if there is no usable one"""
+    try:
+        with open(checkpoint_file, 'r') as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def save_checkpoint(checkpoint_file, checkpoint):
+    write_file(checkpoint_file, json.dumps(checkpoint))
+
+
+def checkpoint_is_valid(checkpoint, csv_file, fieldnames, status_exports):
+    """Can we resume from this checkpoint, or was the file truncated/rewritten/rotated?"""
+    if checkpoint is None or checkpoint.get('version') != 8:
+        return False
+    if checkpoint['fieldnames'] != fieldnames or checkpoint['exports'] != status_exports:
+        return False
+    if checkpoint['inode'] != os.stat(csv_file).st_ino:
+        return False
+    offset = checkpoint['offset']
+    if os.path.getsize(csv_file) < offset:
+        return False
+    if checkpoint['fingerprint'] != file_fingerprint(csv_file, offset):
+        return False
+    # Exports we already wrote rows to must still hold (at least) those rows
+    for status, path in status_exports.items():
+        if checkpoint['export_counts'][status] and not (
+                os.path.exists(path) and os.path.getsize(path) >= checkpoint['export_sizes'][status]):
+            return False
+    return True
+
+
+def restore_exports(checkpoint, status_exports):
+    """
+    Cut each export back to its size at the checkpoint. Rows are appended
+    BEFORE the next checkpoint is saved - after a crash in between, those
+    rows are folded in again and would otherwise be in the export twice
+    """
+    for status, path in status_exports.items():
+        if checkpoint['export_counts'][status]:
+            with open(path, 'r+b') as file:
+                file.truncate(checkpoint['export_sizes'][status])
+
+
+def summarize_csv_incremental(csv_file, checkpoint_file, status_exports=None):
+    """
+    Resume from the last checkpoint and fold in only the rows appended since
+    Falls back to a full rebuild when the checkpoint does not match the file
+    Returns (summary, rows written per status, new rows folded in, resumed?)
+    """
+    require_plain_csv(csv_file)
+    status_exports = status_exports or {}
+    fieldnames, header = read_header(csv_file)
+    checkpoint = load_checkpoint(checkpoint_file)
+
+    resumed = checkpoint_is_valid(checkpoint, csv_file, fieldnames, status_exports)
+    if resumed:
+        summary = checkpoint['summary']
+        summary['cube'] = cube_from_json(summary['cube'])
+        summary['trend'] = cube_from_json(summary['trend'])
+        export_counts = checkpoint['export_counts']
+        restore_exports(checkpoint, status_exports)
+        start = checkpoint['offset']
+    else:
+        summary = new_summary()
+        export_counts = {status: 0 for status in status_exports}
+        start = len(header)
+
+    rows_before = summary['total_orders']
+    offset = fold_range(csv_file, fieldnames, start, os.path.getsize(csv_file), summary,
+                        status_exports, export_counts, header=header, complete_only=True)
+
+    save_summary_checkpoint(checkpoint_file, csv_file, fieldnames, status_exports,
+                            offset, os.stat(csv_file).st_ino, summary, export_counts)
+
+    return summary, export_counts, summary['total_orders'] - rows_before, resumed
+
+
+def save_summary_checkpoint(checkpoint_file, csv_file, fieldnames, status_exports,
+                            offset, inode, summary, export_counts):
+    """Everything needed to resume at `offset` of the file with this inode"""
+    fold_batch(summary)
+    save_checkpoint(checkpoint_file, {
+        'version': 8,
+        'fieldnames': fieldnames,
+        'exports': status_exports,
+        'offset': offset,
+        'inode': inode,
+        'fingerprint': file_fingerprint(csv_file, offset),
+        'summary': dict(summary, cube=cube_to_json(summary['cube']), trend=cube_to_json(summary['trend'])),
+        'export_counts': export_counts,
+        # restore_exports() cuts off rows appended after this checkpoint
+        'export_sizes': {status: os.path.getsize(path) if export_counts[status] else 0
+                         for status, path in status_exports.items()},
+    })
+
+
+def follow_csv(csv_file, checkpoint_file, status_exports=None, poll_interval=1.0, idle_polls=None,
+               checkpoint_seconds=CHECKPOINT_SECONDS, checkpoint_rows=CHECKPOINT_ROWS):
+    """
+    Keep the summary up to date while rows are appended to csv_file (tail -F)
+    Resumes from the checkpoint (or starts at byte 0), then polls for new complete lines
+    Yields (summary, rows written per status, new rows, event): once at the start,
+    then after every batch
+      event: 'start', 'resumed', None, 'rotated' (log continued in a new file)
+      or 'truncated' (file was rewritten - the summary is rebuilt from 0)
+    The checkpoint is saved every checkpoint_seconds / checkpoint_rows, after a
+    rotation or truncation, after a batch that wrote export rows (they are
+    appended - a stale checkpoint would write them twice) and when following stops
+    """
+    require_plain_csv(csv_file)
+    status_exports = status_exports or {}
+    fieldnames, header = read_header(csv_file)
+    checkpoint = load_checkpoint(checkpoint_file)
+
+    if checkpoint_is_valid(checkpoint, csv_file, fieldnames, status_exports):
+        summary = checkpoint['summary']
+        summary['cube'] = cube_from_json(summary['cube'])
+        summary['trend'] = cube_from_json(summary['trend'])
+        export_counts = checkpoint['export_counts']
+        restore_exports(checkpoint, status_exports)
+        tail = open_tail(csv_file, checkpoint['offset'], checkpoint['inode'])
+        event = 'resumed'
+    else:
+        # From byte 0 - fold_lines() skips the header line
+        summary = new_summary()
+        export_counts = {status: 0 for status in status_exports}
+        tail = open_tail(csv_file)
+        event = 'start'
+
+    unsaved = None   # position of rows folded in since the last checkpoint
+    saved_at = time.monotonic()
+    saved_rows = summary['total_orders']
+    try:
+        yield summary, export_counts, 0, event
+
+        for lines, event, position in follow(tail, poll_interval, idle_polls):
+            if event == 'truncated':
+                summary = new_summary()
+                export_counts = {status: 0 for status in status_exports}
+                saved_rows = 0
+
+            rows_before = summary['total_orders']
+            exported_before = sum(export_counts.values())
+            unsaved = None   # a half-folded batch matches no offset - never save it
+            fold_lines(lines, fieldnames, summary, status_exports, export_counts, header)
+            unsaved = position
+
+            if (event or sum(export_counts.values()) != exported_before
+                    or summary['total_orders'] - saved_rows >= checkpoint_rows
+                    or time.monotonic() - saved_at >= checkpoint_seconds):
+                save_summary_checkpoint(checkpoint_file, csv_file, fieldnames, status_exports,
+                                        position['offset'], position['inode'], summary, export_counts)
+                unsaved = None
+                saved_at = time.monotonic()
+                saved_rows = summary['total_orders']
+            yield summary, export_counts, summary['total_orders'] - rows_before, event
+    finally:
+        # Stopped (Ctrl+C, idle_polls, caller broke off) - keep what was folded in
+        if unsaved is not None:
+            save_summary_checkpoint(checkpoint_file, csv_file, fieldnames, status_exports,
+                                    unsaved['offset'], unsaved['inode'], summary, export_counts)
+        close_tail(tail)
+
+
+# ==========================================
+# 6. REPORT BUILDING
+# ==========================================
+
+def build_report_lines(summary, generated_at):
+    """
+    Turn a summary into the lines of performance_report.txt
+    (No order rows needed - everything comes from the summary)
+    """
+    total_orders = summary['total_orders']
+    total_revenue = summary['total_revenue']
+    status_counts = summary['status_counts']
+    city_stats = summary['city_stats']
+    tech_stats = summary['tech_stats']
+    service_stats = summary['service_stats']
+
+    report_content = []
+    report_content.append("=" * 70)
+    report_content.append("WINDSHIELDHUB ORDER PERFORMANCE REPORT")
+    report_content.append(f"Generated: {generated_at.strftime('%Y-%m-%d %H:%M:%S')}")
+    report_content.append("=" * 70)
+    report_content.append("")
+
+    report_content.append("EXECUTIVE SUMMARY")
+    report_content.append("-" * 70)
+    report_content.append(f"Total Orders: {total_orders}")
+    report_content.append(f"Total Revenue: Rs.{total_revenue:,}")
+    report_content.append(f"Average Order Value: Rs.{total_revenue // total_orders if total_orders else 0:,}")
+    report_content.append("")
+
+    report_content.append("ORDER STATUS BREAKDOWN")
+    report_content.append("-" * 70)
+    for status in sorted(status_counts.keys()):
+        count = status_counts[status]['count']
+        revenue = status_counts[status]['revenue']
+        percentage = (count / total_orders) * 100
+        report_content.append(f"{status.upper()}: {count} orders ({percentage:.1f}%) - Rs.{revenue:,}")
+    report_content.append("")
+
+    report_content.append("REVENUE BY CITY")
+    report_content.append("-" * 70)
+    for city in sorted(city_stats.keys(), key=lambda x: city_stats[x]['revenue'], reverse=True):
+        count = city_stats[city]['count']
+        revenue = city_stats[city]['revenue']
+        avg = revenue // count
+        report_content.append(f"{city}: {count} orders - Rs.{revenue:,} (avg: Rs.{avg})")
+    report_content.append("")
+
+    report_content.append("TECHNICIAN PERFORMANCE")
+    report_content.append("-" * 70)
+    for tech in sorted(tech_stats.keys()):
+        stats = tech_stats[tech]
+        tech_orders = stats['completed'] + stats['pending'] + stats['in_progress']
+        completion_rate = (stats['completed'] / tech_orders * 100) if tech_orders > 0 else 0
+        report_content.append(f"{tech}:")
+        report_content.append(f"  Total Orders: {tech_orders}")
+        report_content.append(f"  Completed: {stats['completed']} ({completion_rate:.0f}%)")
+        report_content.append(f"  Pending: {stats['pending']}")
+        report_content.append(f"  In Progress: {stats['in_progress']}")
+        report_content.append(f"  Revenue Generated: Rs.{stats['revenue']:,}")
+    report_content.append("")
+
+    report_content.append("SERVICE TYPE ANALYSIS")
+    report_content.append("-" * 70)
+    for service in sorted(service_stats.keys()):
+        count = service_stats[service]['count']
+        revenue = service_stats[service]['revenue']
+        avg = revenue // count
+        percentage = (count / total_orders) * 100
+        report_content.append(f"{service}: {count} orders ({percentage:.0f}%) - Rs.{revenue:,} (avg: Rs.{avg})")
+    report_content.append("")
+
+    # Cross breakdowns come from the rollup cube - no extra pass over the orders
+    report_content.append("REVENUE BY CITY AND TECHNICIAN")
+    report_content.append("-" * 70)
+    for (city, tech), stats in sorted(rollup(summary['cube'], ['city', 'technician']).items()):
+        report_content.append(f"{city} / {tech}: {stats['count']} orders - Rs.{stats['revenue']:,}")
+    report_content.append("")
+
+    report_content.append("SERVICE TYPE BY STATUS")
+    report_content.append("-" * 70)
+    for (service, status), stats in sorted(rollup(summary['cube'], ['service_type', 'status']).items()):
+        report_content.append(f"{service} / {status}: {stats['count']} orders - Rs.{stats['revenue']:,}")
+    report_content.append("")
+
+    # Trends come from the (date, status) cells - dates were parsed once each
+    date_status = rollup(summary['trend'], ['date', 'status'], TREND_DIMENSIONS)
+    for bucket, title in (('month', "MONTHLY TREND"), ('week', "WEEKLY TREND")):
+        report_content.append(title)
+        report_content.append("-" * 70)
+        for start, stats in time_series(date_status, bucket).items():
+            statuses = ", ".join(f"{status} {stats[status]}" for status in sorted(stats)
+                                 if status not in ('count', 'revenue'))
+            report_content.append(f"{period_label(start, bucket)}: {stats['count']} orders - "
+                                  f"Rs.{stats['revenue']:,} ({statuses})")
+        report_content.append("")
+
+    # Customers are ranked by the top-K trackers - no dict of every customer
+    report_content.append("TOP CUSTOMERS")
+    report_content.append("-" * 70)
+    for measure, label in (('revenue', 'By revenue'), ('orders', 'By order count')):
+        report_content.append(f"{label}:")
+        for name, count, error in topk_items(summary['heavy_hitters'][f"customer_name:{measure}"], 5):
+            # With an error the true total is only known to lie in [count - error, count]
+            low = count - error
+            if measure == 'revenue':
+                value = f"Rs.{low:,} - Rs.{count:,}" if error else f"Rs.{count:,}"
+            else:
+                value = f"{low} - {count} orders" if error else f"{count} orders"
+            report_content.append(f"  {name}: {value}")
+    report_content.append("")
+
+    report_content.append("INSIGHTS & RECOMMENDATIONS")
+    report_content.append("-" * 70)
+
+    if city_stats:
+        # Find top performing city
+        top_city = max(city_stats.keys(), key=lambda x: city_stats[x]['revenue'])
+        report_content.append(f"✓ Best performing city: {top_city} with Rs.{city_stats[top_city]['revenue']:,}")
+
+    if tech_stats:
+        # Find top technician
+        top_tech = max(tech_stats.keys(), key=lambda x: tech_stats[x]['revenue'])
+        report_content.append(f"✓ Top technician: {top_tech} with Rs.{tech_stats[top_tech]['revenue']:,}")
+
+    # Pending orders
+    report_content.append(f"⚠️  Pending orders requiring follow-up: {summary['pending_count']}")
+
+    report_content.append("")
+    report_content.append("=" * 70)
+    report_content.append("END OF REPORT")
+    report_content.append("=" * 70)
+
+    return report_content
@@ -0,0 +1,223 @@
+# DAY 7: Columnar Order Store
+# Instead of one dict per order (hundreds of bytes each), keep one compact
+# array per column. Repeated strings like "Lahore" or "completed" are stored
+# ONCE in a shared dictionary - the columns only hold small integer codes.
+# (Like a MySQL ENUM column: the table stores a number, not the text)
+
+import csv
+import sys
+from array import array
+from collections import Counter
+
+from order_cube import CUBE_DIMENSIONS, TREND_DIMENSIONS
+from order_dates import day_number
+from order_engine import new_summary, open_text, HEAVY_HITTER_COLUMNS
+from order_topk import topk_from_totals
+
+# Columns kept as plain numbers - every other column is dictionary-encoded
+INT_COLUMNS = ('order_id', 'amount')
+
+
+# ==========================================
+# 1. BUILDING THE STORE
+# ==========================================
+
+def new_store(fieldnames):
+    """Empty store: one array per column + the shared string dictionary"""
+    columns = {}
+    for name in fieldnames:
+        # 'q' = 8-byte int for numbers, 'i' = 4-byte int for dictionary codes
+        columns[name] = array('q') if name in INT_COLUMNS else array('i')
+    return {
+        'fieldnames': list(fieldnames),
+        'columns': columns,
+        'dictionary': [],   # code -> string
+        'codes': {},        # string -> code, only while rows are added (see finish_store)
+    }
+
+
+def encode(store, value):
+    """Return the code for a string, adding it to the dictionary the first time"""
+    code = store['codes'].get(value)
+    if code is None:
+        code = store['codes'][value] = len(store['dictionary'])
+        store['dictionary'].append(value)
+    return code
+
+
+def add_row(store, row):
+    """Append one CSV row (list of strings in fieldnames order)"""
+    columns = store['columns']
+    for name, value in zip(store['fieldnames'], row):
+        if name in INT_COLUMNS:
+            columns[name].append(int(value))
+        else:
+            columns[name].append(encode(store, value))
+
+
+def finish_store(store):
+    """
+    Done adding rows: drop the string -> code lookup. With many distinct
+    customers it is as big as all the code arrays together (a dict slot +
+    an int object per string); code_of() searches the dictionary list instead
+    """
+    store['codes'] = None
+    return store
+
+
+def load_store(csv_file):
+    """Stream a CSV (plain or compressed) straight into a columnar store (no per-row dicts)"""
+    with open_text(csv_file) as file:
+        reader = csv.reader(file)
+        store = new_store(next(reader))
+        for row in reader:
+            if row:
+                add_row(store, row)
+    return finish_store(store)
+
+
+def store_size(store):
+    """Number of orders in the store"""
+    return len(store['columns']['amount'])
+
+
+def store_nbytes(store):
+    """
+    Memory used by the store: the arrays (allocated size), the dictionary list
+    and its strings, and the string -> code lookup while there is one
+    On the 200k-row benchmark file this matches tracemalloc within 1%:
+    13.0 MB, 11.2x less than the DictReader row list (144.6 MB)
+    A cached store's columns are memoryviews of mapped files - getsizeof()
+    only sees the view object, so those count their .nbytes
+    """
+    total = sum(column.nbytes if isinstance(column, memoryview) else sys.getsizeof(column)
+                for column in store['columns'].values())
+    total += sys.getsizeof(store['dictionary'])
+    total += sum(sys.getsizeof(word) for word in store['dictionary'])
+    if store['codes'] is not None:
+        total += sys.getsizeof(store['codes'])
+        # Codes up to 256 are shared small ints, the others are objects of their own
+        total += sum(sys.getsizeof(code) for code in store['codes'].values() if code > 256)
+    return total
+
+
+def store_rows(store, indexes=None):
+    """
+    Decode rows back to lists of strings (for CSV exports)
+    indexes limits the output to those row numbers
+    """
+    words = store['dictionary']
+    columns = [store['columns'][name] for name in store['fieldnames']]
+    is_int = [name in INT_COLUMNS for name in store['fieldnames']]
+    if indexes is None:
+        indexes = range(store_size(store))
+    for i in indexes:
+        yield [str(column[i]) if numeric else words[column[i]]
+               for column, numeric in zip(columns, is_int)]
+
+
+def code_of(store, value):
+    """Code of a string, or None if it never occurs"""
+    if store['codes'] is not None:
+        return store['codes'].get(value)
+    try:
+        return store['dictionary'].index(value)   # one C-level scan, a few ms
+    except ValueError:
+        return None
+
+
+def rows_with(store, column, value):
+    """Row numbers where column == value (compares codes, not strings)"""
+    code = code_of(store, value)
+    if code is None:
+        return []
+    return [i for i, c in enumerate(store['columns'][column]) if c == code]
+
+
+# ==========================================
+# 2. METRICS STRAIGHT FROM THE CODES
+# ==========================================
+
+def group_totals(store, column):
+    """
+    (orders per code, revenue per code) for one dictionary-encoded column
+    Counter does the counting in C - one entry per distinct value, in
+    first-seen order like the row-by-row engine. Revenue is summed into an
+    array indexed by code: 8 bytes per dictionary string, however many
+    (code, amount) combinations there are (close to one per row for customers)
+    """
+    codes = store['columns'][column]
+    revenue = array('q', bytes(8 * len(store['dictionary'])))
+    for code, amount in zip(codes, store['columns']['amount']):
+        revenue[code] += amount
+    return Counter(codes), revenue
+
+
+def group_stats(store, column):
+    """{value: {'count': n, 'revenue': total}} for one dictionary-encoded column"""
+    words = store['dictionary']
+    counts, revenue = group_totals(store, column)
+    return {words[code]: {'count': n, 'revenue': revenue[code]} for code, n in counts.items()}
+
+
+def summarize_store(store):
+    """Build the same summary as order_engine.summarize_orders() from the columns"""
+    words = store['dictionary']
+    amounts = store['columns']['amount']
+    summary = new_summary()
+
+    summary['total_orders'] = len(amounts)
+    summary['total_revenue'] = sum(amounts)
+    summary['status_counts'] = group_stats(store, 'status')
+    summary['city_stats'] = group_stats(store, 'city')
+    summary['service_stats'] = group_stats(store, 'service_type')
+    summary['completed_count'] = summary['status_counts'].get('completed', {}).get('count', 0)
+    summary['pending_count'] = summary['status_counts'].get('pending', {}).get('count', 0)
+
+    techs = store['columns']['technician']
+    tech_status = Counter(zip(techs, store['columns']['status']))
+    for tech, stats in group_stats(store, 'technician').items():
+        summary['tech_stats'][tech] = {
+            'completed': 0, 'pending': 0, 'in_progress': 0, 'revenue': stats['revenue']
+        }
+    for (tech, status), n in tech_status.items():
+        stats = summary['tech_stats'][words[tech]]
+        stats[words[status]] = stats.get(words[status], 0) + n
+
+    summary['cube'] = cube_from_store(store)
+    summary['trend'] = cube_from_store(store, TREND_DIMENSIONS)
+
+    # Every row is in memory anyway, so the top-K trackers can be exact
+    for column in HEAVY_HITTER_COLUMNS:
+        counts, revenue = group_totals(store, column)
+        summary['heavy_hitters'][column + ':orders'] = topk_from_totals(
+            {words[code]: n for code, n in counts.items()})
+        summary['heavy_hitters'][column + ':revenue'] = topk_from_totals(
+            {words[code]: revenue[code] for code in counts})
+    return summary
+
+
+def cube_from_store(store, dimensions=CUBE_DIMENSIONS):
+    """
+    Build a cube (see order_cube.py) over `dimensions` by counting code tuples
+    cube_from_store(store, TREND_DIMENSIONS) gives the (date, status) trend,
+    cube_from_store(store, FULL_CUBE_DIMENSIONS) the full cube - on request only
+    """
+    words = store['dictionary']
+    columns = [store['columns'][name] for name in dimensions]
+    amounts = store['columns']['amount']
+    date_at = dimensions.index('date') if 'date' in dimensions else None
+
+    def cell_key(codes):
+        # Same key as order_cube.add_batch(): text values, date as a day number
+        values = [words[code] for code in codes]
+        if date_at is not None:
+            values[date_at] = day_number(values[date_at])
+        return tuple(values)
+
+    cube = {}
+    for codes, n in Counter(zip(*columns)).items():
+        cube[cell_key(codes)] = [n, 0]
+    for codes_and_amount, n in Counter(zip(*columns, amounts)).items():
+        cube[cell_key(codes_and_amount[:-1])][1] += codes_and_amount[-1] * n
+    return cube
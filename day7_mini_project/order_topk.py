@@ -0,0 +1,123 @@
+# DAY 7: Streaming Top-K (Space-Saving counters)
+# Find the biggest customers without a dict that holds EVERY customer.
+# A tracker keeps at most `capacity` counters. When a new key arrives and
+# all counters are taken, the smallest counter is handed over to the new key
+# and its old value is remembered as the possible over-count ("error").
+# Every key that really is in the top K is guaranteed to be tracked, and
+# its true total lies between count - error and count.
+# When most keys are new (customers), a per-row update evicts on nearly
+# every row - topk_add_totals() folds in the exact totals of a whole batch
+# of rows with one merge instead.
+
+import heapq
+
+TOPK_CAPACITY = 1000
+
+
+# ==========================================
+# 1. THE TRACKER
+# ==========================================
+
+def new_topk(capacity=TOPK_CAPACITY):
+    """
+    Empty tracker
+    counters: key -> [count, error]
+    heap: [count, key] entries to find the smallest counter fast (only used once full)
+    """
+    return {'capacity': capacity, 'counters': {}, 'heap': []}
+
+
+def rebuild_heap(topk):
+    """Throw away stale heap entries - one fresh entry per counter"""
+    if len(topk['counters']) >= topk['capacity']:
+        topk['heap'] = [[counter[0], key] for key, counter in topk['counters'].items()]
+        heapq.heapify(topk['heap'])
+    else:
+        topk['heap'] = []
+
+
+def topk_add(topk, key, weight=1):
+    """Count `weight` for key (1 for order counts, the amount for revenue)"""
+    counters = topk['counters']
+    counter = counters.get(key)
+
+    # Not full yet: exact counting, no heap needed
+    if len(counters) < topk['capacity']:
+        if counter is None:
+            counters[key] = [weight, 0]
+            if len(counters) == topk['capacity']:
+                rebuild_heap(topk)
+        else:
+            counter[0] += weight
+        return
+
+    heap = topk['heap']
+    if counter is not None:
+        counter[0] += weight
+        heapq.heappush(heap, [counter[0], key])
+    else:
+        # Take over the smallest counter - skip heap entries that are out of date
+        while True:
+            smallest, old_key = heapq.heappop(heap)
+            old = counters.get(old_key)
+            if old is not None and old[0] == smallest:
+                break
+        del counters[old_key]
+        counters[key] = [smallest + weight, smallest]
+        heapq.heappush(heap, [smallest + weight, key])
+
+    # Every update leaves an old entry behind - compact now and then
+    if len(heap) > 4 * topk['capacity']:
+        rebuild_heap(topk)
+
+
+def topk_add_totals(topk, totals):
+    """Count a batch at once: {key: total of the batch} (same guarantees as topk_add)"""
+    return merge_topk(topk, topk_from_totals(totals, topk['capacity']))
+
+
+def topk_from_totals(totals, capacity=TOPK_CAPACITY):
+    """Tracker holding the exact top `capacity` of a {key: total} dict (error 0)"""
+    topk = new_topk(capacity)
+    biggest = heapq.nlargest(capacity, totals.items(), key=lambda item: item[1])
+    topk['counters'] = {key: [total, 0] for key, total in biggest}
+    rebuild_heap(topk)
+    return topk
+
+
+def topk_items(topk, limit=None):
+    """[(key, count, error), ...] biggest first - true total is in [count - error, count]"""
+    items = sorted(topk['counters'].items(), key=lambda item: item[1][0], reverse=True)
+    return [(key, count, error) for key, (count, error) in items[:limit]]
+
+
+# ==========================================
+# 2. COMBINING TRACKERS (PARALLEL WORKERS)
+# ==========================================
+
+def topk_floor(topk):
+    """Most a key the tracker does NOT hold could have had (0 if never full)"""
+    if len(topk['counters']) < topk['capacity']:
+        return 0
+    return min(counter[0] for counter in topk['counters'].values())
+
+
+def merge_topk(topk, other):
+    """
+    Add `other` into `topk` (mergeable Space-Saving summary)
+    A key missing on one side might still have up to that side's floor,
+    so the floor is added to both its count and its error
+    """
+    floor, other_floor = topk_floor(topk), topk_floor(other)
+    counters, other_counters = topk['counters'], other['counters']
+
+    merged = {}
+    for key in list(counters) + [key for key in other_counters if key not in counters]:
+        count, error = counters.get(key, [floor, floor])
+        other_count, other_error = other_counters.get(key, [other_floor, other_floor])
+        merged[key] = [count + other_count, error + other_error]
+
+    biggest = sorted(merged.items(), key=lambda item: item[1][0], reverse=True)
+    topk['counters'] = dict(biggest[:topk['capacity']])
+    rebuild_heap(topk)
+    return topk
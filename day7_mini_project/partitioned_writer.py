@@ -0,0 +1,165 @@
+# DAY 7: Partitioned CSV Writer
+# Send every row to its own output file by the value of one column
+# (status, city, technician, ...) in ONE pass over the orders.
+#   - rows are collected in batches and written with big buffered writes;
+#     at most `max_pending` rows wait in memory over ALL keys (a column with
+#     a value per customer would otherwise keep every row until the end)
+#   - only `max_open` files are open at the same time (least recently used is closed)
+#   - each file is written as <name>.tmp and renamed when everything is done,
+#     so other jobs never see a half-written export
+#   - rows become text lines with join_row() from Day 4's csv_output.py
+#     (plain ','.join() unless a value needs quotes) instead of DictWriter
+# Import order_engine first - it puts day4_file_handling on sys.path
+
+import hashlib
+import os
+import re
+from collections import OrderedDict
+
+from csv_output import join_row
+
+
+# ==========================================
+# 1. OPENING A PARTITIONED WRITER
+# ==========================================
+
+def open_partitions(key_column, fieldnames, paths, max_open=32,
+                    buffer_size=1024 * 1024, batch_rows=5000, max_pending=50_000):
+    """
+    key_column: column that decides where a row goes
+    paths: {key: path} to write only those keys, or a template like
+           'orders_by_city/{key}.csv' to give every key its own file
+    """
+    return {
+        'key_column': key_column,
+        'fieldnames': list(fieldnames),
+        'paths': paths,
+        'max_open': max_open,
+        'buffer_size': buffer_size,
+        'batch_rows': batch_rows,
+        'max_pending': max_pending,
+        'pending': {},              # key -> CSV lines waiting to be written
+        'pending_rows': 0,
+        'key_paths': {},            # key -> final path (template paths)
+        'taken_paths': set(),       # lower-cased final paths already given to a key
+        'counts': {},               # key -> rows written so far
+        'temp_paths': {},           # key -> (temp path, final path)
+        'handles': OrderedDict(),   # key -> open file, least recently used first
+    }
+
+
+def partition_path(writer, key):
+    """Final path for a key, or None when the key is not exported"""
+    paths = writer['paths']
+    if isinstance(paths, dict):
+        return paths.get(key)
+    path = writer['key_paths'].get(key)
+    if path is None:
+        # Keep values like "in/progress" from escaping the output folder. A name
+        # that had to change gets a hash of the real value - 'St. Louis' and
+        # 'St/ Louis' must not end up in the same file
+        name = re.sub(r'[^\w.-]', '_', key)
+        if name != key or not name or name.startswith('.'):
+            name = f"{name}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}"
+        # Names that differ only in case share a file on Windows/macOS disks
+        candidate, number = name, 1
+        while paths.format(key=candidate).lower() in writer['taken_paths']:
+            number += 1
+            candidate = f"{name}-{number}"
+        path = writer['key_paths'][key] = paths.format(key=candidate)
+        writer['taken_paths'].add(path.lower())
+    return path
+
+
+# ==========================================
+# 2. WRITING ROWS
+# ==========================================
+
+def write_partitioned(writer, row):
+    """Queue one dict row for its partition (written in batches)"""
+    key = row[writer['key_column']]
+    pending = writer['pending'].get(key)
+    if pending is None:
+        if key not in writer['counts'] and partition_path(writer, key) is None:
+            return
+        pending = writer['pending'][key] = []
+    # Queued as a finished line - much smaller than the row dict
+    pending.append(join_row([row.get(name, '') for name in writer['fieldnames']]))
+    writer['pending_rows'] += 1
+    if len(pending) >= writer['batch_rows']:
+        flush_partition(writer, key)
+    elif writer['pending_rows'] >= writer['max_pending']:
+        flush_largest(writer)
+
+
+def flush_largest(writer):
+    """Too many rows waiting: write the biggest batches until half are gone"""
+    pending = writer['pending']
+    for key in sorted(pending, key=lambda key: len(pending[key]), reverse=True):
+        if writer['pending_rows'] <= writer['max_pending'] // 2:
+            break
+        flush_partition(writer, key)
+
+
+def flush_partition(writer, key):
+    """Write the queued lines of one key to its temp file"""
+    lines = writer['pending'].pop(key, None)
+    if not lines:
+        return
+    writer['pending_rows'] -= len(lines)
+
+    handles = writer['handles']
+    file = handles.get(key)
+    if file is None:
+        # Too many open files? Close the one used longest ago
+        if len(handles) >= writer['max_open']:
+            _, oldest = handles.popitem(last=False)
+            oldest.close()
+
+        if key in writer['temp_paths']:
+            file = open(writer['temp_paths'][key][0], 'a', newline='', buffering=writer['buffer_size'])
+        else:
+            final_path = partition_path(writer, key)
+            folder = os.path.dirname(final_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            temp_path = final_path + '.tmp'
+            writer['temp_paths'][key] = (temp_path, final_path)
+            file = open(temp_path, 'w', newline='', buffering=writer['buffer_size'])
+            file.write(join_row(writer['fieldnames']))
+        handles[key] = file
+    else:
+        handles.move_to_end(key)
+
+    file.write(''.join(lines))
+    writer['counts'][key] = writer['counts'].get(key, 0) + len(lines)
+
+
+# ==========================================
+# 3. FINISHING
+# ==========================================
+
+def close_partitions(writer):
+    """
+    Flush everything and rename each temp file to its final name
+    Returns {key: rows written}
+    """
+    for key in list(writer['pending']):
+        flush_partition(writer, key)
+    for file in writer['handles'].values():
+        file.close()
+    writer['handles'].clear()
+
+    for temp_path, final_path in writer['temp_paths'].values():
+        os.replace(temp_path, final_path)
+    return dict(writer['counts'])
+
+
+def abort_partitions(writer):
+    """Something went wrong - close and delete the temp files, keep old exports"""
+    for file in writer['handles'].values():
+        file.close()
+    writer['handles'].clear()
+    for temp_path, _ in writer['temp_paths'].values():
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
@@ -0,0 +1,165 @@
+# DAY 7: Binary Sidecar Cache for the Columnar Store
+# Parsing CSV text is the slow part of every run. The first time a CSV is
+# loaded, its columnar store (see order_store.py) is also saved next to it:
+#
+#   orders.csv.colcache/
+#       meta.json         source file signature, column names, string dictionary
+#       0.npy, 1.npy ...  one binary file per column (NumPy .npy format)
+#
+# Later runs memory-map those files instead of parsing any text - the OS
+# pages the numbers in as they are used. If orders.csv changes (size,
+# modification time or inode), the cache is rebuilt automatically.
+# (Like Laravel's `php artisan config:cache` - a compiled copy that is
+# thrown away when the source changes)
+#
+# The .npy files are written and read with the standard library only;
+# with NumPy installed they also open with np.load(path, mmap_mode='r').
+
+import ast
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+
+from order_store import load_store
+# Day 4's parse cache uses the same "has the file changed?" check
+# (order_engine, imported by order_store, puts day4_file_handling on sys.path)
+from csv_cache import file_signature
+
+CACHE_VERSION = 1
+NPY_MAGIC = b'\x93NUMPY\x01\x00'
+
+
+def cache_dir_for(csv_file):
+    return csv_file + '.colcache'
+
+
+# ==========================================
+# 1. .NPY FILES (NO NUMPY NEEDED)
+# ==========================================
+
+def npy_descr(column):
+    """NumPy type string for an array column, e.g. '<i8' for array('q')"""
+    order = '<' if sys.byteorder == 'little' else '>'
+    return f"{order}i{column.itemsize}"
+
+
+def write_npy(path, column):
+    """Save an array('q'/'i') as a 1-D .npy file"""
+    header = repr({'descr': npy_descr(column), 'fortran_order': False, 'shape': (len(column),)})
+    # Pad so the data starts on a 64-byte boundary (as NumPy does)
+    padding = 64 - (len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header = (header + ' ' * padding + '\n').encode('latin1')
+    with open(path, 'wb') as file:
+        file.write(NPY_MAGIC + struct.pack('<H', len(header)) + header)
+        column.tofile(file)
+
+
+def map_npy(path, typecode):
+    """
+    Memory-map a .npy file written by write_npy() as a read-only column
+    Returns a memoryview that indexes, slices and iterates like the array
+    """
+    with open(path, 'rb') as file:
+        prefix = file.read(len(NPY_MAGIC) + 2)
+        if prefix[:len(NPY_MAGIC)] != NPY_MAGIC:
+            raise ValueError(f"{path} is not a version 1.0 .npy file")
+        header_size = struct.unpack('<H', prefix[len(NPY_MAGIC):])[0]
+        header = ast.literal_eval(file.read(header_size).decode('latin1'))
+        data_start = len(prefix) + header_size
+
+        expected = memoryview(bytes(struct.calcsize(typecode))).cast(typecode)
+        if header['descr'] != npy_descr(expected) or header['fortran_order']:
+            raise ValueError(f"{path}: unexpected column type {header['descr']}")
+        if header['shape'][0] == 0:
+            return expected[:0]
+        # The mmap stays open as long as the memoryview is alive
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped)[data_start:].cast(typecode)
+
+
+# ==========================================
+# 2. WRITING AND READING THE SIDECAR
+# ==========================================
+
+def save_store_cache(store, csv_file, signature):
+    """
+    Write the sidecar for csv_file: columns into a temp folder first, then
+    swapped in - other readers never see half a cache
+    """
+    cache_dir = cache_dir_for(csv_file)
+    temp_dir = f"{cache_dir}.tmp{os.getpid()}"
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    os.makedirs(temp_dir)
+
+    columns = {}
+    for position, name in enumerate(store['fieldnames']):
+        column = store['columns'][name]
+        file_name = f"{position}.npy"   # column names may not be valid file names
+        write_npy(os.path.join(temp_dir, file_name), column)
+        columns[name] = {'file': file_name, 'typecode': column.typecode}
+
+    with open(os.path.join(temp_dir, 'meta.json'), 'w', encoding='utf-8') as file:
+        json.dump({
+            'version': CACHE_VERSION,
+            'signature': list(signature),
+            'fieldnames': store['fieldnames'],
+            'columns': columns,
+            'dictionary': store['dictionary'],
+        }, file)
+
+    old_dir = f"{cache_dir}.old{os.getpid()}"
+    if os.path.exists(cache_dir):
+        os.rename(cache_dir, old_dir)
+    os.rename(temp_dir, cache_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def open_store_cache(csv_file, signature):
+    """The cached store of csv_file, or None if missing, outdated or unreadable"""
+    cache_dir = cache_dir_for(csv_file)
+    try:
+        with open(os.path.join(cache_dir, 'meta.json'), 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        if meta.get('version') != CACHE_VERSION or meta['signature'] != list(signature):
+            return None
+        columns = {name: map_npy(os.path.join(cache_dir, info['file']), info['typecode'])
+                   for name, info in meta['columns'].items()}
+    except (OSError, ValueError, KeyError, SyntaxError):
+        return None
+
+    dictionary = meta['dictionary']
+    return {
+        'fieldnames': meta['fieldnames'],
+        'columns': columns,
+        'dictionary': dictionary,
+        'codes': None,   # read-only - see order_store.finish_store()
+    }
+
+
+# ==========================================
+# 3. DROP-IN LOADER
+# ==========================================
+
+def cached_store(csv_file):
+    """
+    Like order_store.load_store(), but reuses the binary sidecar when it is
+    up to date -> (store, 'hit' | 'built' | 'uncached')
+    The cached store is read-only (its columns are memory-mapped)
+    """
+    signature = file_signature(csv_file)
+    store = open_store_cache(csv_file, signature)
+    if store is not None:
+        return store, 'hit'
+
+    store = load_store(csv_file)
+    # Only cache if the CSV did not change while we were reading it
+    if file_signature(csv_file) != signature:
+        return store, 'uncached'
+    try:
+        save_store_cache(store, csv_file, signature)
+    except OSError:
+        return store, 'uncached'   # e.g. read-only folder - still works, just slower
+    return store, 'built'